@@ -0,0 +1,235 @@
+import argparse
+import json
+import platform
+import random
+import os
+import subprocess
+import tempfile
+import time
+import timeit
+import numpy as np
+from brain import BrainPipeline
+from environment import EdenOfShadows
+from entity import LiminalEntity
+from evolution import BitNetGenome, PolicyTable, activation_quant_8bit
+from pfc import SyntheticPFC, SyntheticPFCBank
+from pmc import SyntheticM1, SyntheticM1Bank
+from premotor import SyntheticPMC, SyntheticPMCBank, MACROS
+from replay import ReplayRecorder
+from spatial import neighbourhood_counts
+
+# (engine, world side, starting population) for the tick-loop benchmark
+TICK_CASES = [
+    ("object", 50, 100),
+    ("object", 200, 1000),
+    ("vectorized", 50, 100),
+    ("vectorized", 200, 1000),
+    ("vectorized", 500, 10000),
+    ("vectorized", 2000, 100000),
+]
+QUICK_TICK_CASES = TICK_CASES[:4]
+# (world side, starting population) for the full brain pipeline on the vectorized engine
+BRAIN_CASES = [(200, 1000), (500, 10000)]
+# (world side, starting population) for the vectorized tick loop while writing a replay log
+RECORD_CASES = [(200, 1000), (500, 10000)]
+
+
+def _per_call(fn, min_time=0.2, repeat=5):
+    """Best-of-`repeat` seconds per call, with the loop count auto-scaled to ~min_time."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def bench_tick_loop(engine, side, population, ticks=10, seed=0, brain=False, record=False):
+    random.seed(seed)
+    np.random.seed(seed)
+    # Roughly one food per eight cells keeps densities comparable across grid sizes
+    env = EdenOfShadows(width=side, height=side, max_food=side * side // 8, engine=engine)
+    for _ in range(population):
+        env.add_entity(LiminalEntity(calories=200))
+    stepper = BrainPipeline(env) if brain else env
+    # Keyframes only at the start, so the timed ticks pay for the event log alone
+    recorder = ReplayRecorder(env, os.path.join(tempfile.mkdtemp(), "bench.rpl"), keyframe_every=10 ** 9) \
+        if record else None
+    stepper.step() # Warm-up
+
+    sizes = []
+    start = time.perf_counter()
+    for _ in range(ticks):
+        stepper.step()
+        sizes.append(len(env.entities))
+    elapsed = time.perf_counter() - start
+    if recorder is not None:
+        recorder.close()
+    return {
+        'value': ticks / elapsed, 'unit': "ticks/sec",
+        'params': {'engine': engine, 'grid': side, 'start_population': population,
+                   'mean_population': float(np.mean(sizes)), 'ticks': ticks, 'brain': brain, 'record': record},
+    }
+
+
+def bench_micro():
+    np.random.seed(0)
+    random.seed(0)
+    results = {}
+
+    genome = BitNetGenome(layer_sizes=[10, 16, 5])
+    state = np.array([1, 0, 0, 1, 0, 0, 0, 1, 0, 0.75])
+    results['bitnet_forward'] = _per_call(lambda: genome.forward(state))
+    fused, state_list = genome.fused(), state.tolist()
+    results['bitnet_forward_fused'] = _per_call(lambda: fused.forward(state_list))
+    table = PolicyTable(genome)
+    vision = state[:9].astype(int).tolist()
+    results['policy_table_lookup'] = _per_call(lambda: table.lookup(vision, 150))
+    results['activation_quant_8bit'] = _per_call(lambda: activation_quant_8bit(state.astype(np.float32)))
+
+    env = EdenOfShadows(width=50, height=50, max_food=300)
+    env.spawn_food()
+    results['get_local_vision'] = _per_call(lambda: env.get_local_vision(25, 25, radius=1))
+    results['get_local_vision_edge'] = _per_call(lambda: env.get_local_vision(0, 49, radius=1))
+
+    pfc = SyntheticPFC(max_energy=1e12) # Never depletes, so every tick does full work
+    for i in range(8):
+        pfc.update_working_memory(f"ITEM_{i}", i, current_tick=0)
+    counter = [0]
+
+    def pfc_tick():
+        counter[0] += 1
+        pfc.tick(current_tick=counter[0], stress_level=0.0, goal_achieved=counter[0] % 3 == 0)
+        if len(pfc.working_memory) < 8:
+            pfc.update_working_memory(f"ITEM_{counter[0]}", counter[0], current_tick=counter[0])
+    results['pfc_tick'] = _per_call(pfc_tick)
+
+    bank = SyntheticPFCBank(10000, max_energy=1e12)
+    bank.update_working_memory(np.arange(10000).repeat(8), np.tile(np.arange(8), 10000), current_tick=0)
+    stress = np.random.rand(10000)
+    bank_tick = [0]
+
+    def pfc_bank_tick():
+        t = bank_tick[0] = bank_tick[0] + 1
+        bank.tick(current_tick=t, stress_level=stress, goal_achieved=t % 3 == 0)
+    results['pfc_bank_tick_10k'] = _per_call(pfc_bank_tick)
+
+    m1 = SyntheticM1()
+    m1_tick = [0]
+
+    def m1_execute():
+        t = m1_tick[0] = m1_tick[0] + 1
+        m1.receive_command(current_tick=t, body_part="LEGS", target_vector=(1, 0), force_multiplier=1.0, limbic_stress=0.3)
+        m1.last_expected_position = None # Keep proprioception from tripping the benchmark
+        m1.execute_tick(t, (0, 0))
+    results['m1_execute_tick'] = _per_call(m1_execute)
+
+    m1_bank = SyntheticM1Bank(10000)
+    rows = np.arange(10000)
+    parts = np.full(10000, 2) # LEGS
+    vectors = np.tile([1, 0], (10000, 1))
+    forces, limbic = np.ones(10000), np.full(10000, 0.3)
+    positions = np.zeros((10000, 2), dtype=np.int64)
+
+    def m1_bank_execute():
+        t = m1_tick[0] = m1_tick[0] + 1
+        m1_bank.receive_batch(t, rows, parts, vectors, forces, limbic)
+        m1_bank.has_expected[:] = False # Keep proprioception from tripping the benchmark
+        m1_bank.execute_tick(t, positions)
+    results['m1_bank_execute_tick_10k'] = _per_call(m1_bank_execute)
+
+    pmc = SyntheticPMC()
+    sink = SyntheticM1()
+
+    def prepare():
+        pmc.prepare_macro("COMPLEX_EVADE", pfc_cognitive_load=0.9, limbic_stress=0.8, current_tick=0, m1_module=sink)
+        sink.spinal_cord_queue.clear()
+    results['pmc_prepare_macro'] = _per_call(prepare)
+
+    xs, ys = np.random.randint(0, 500, 10000), np.random.randint(0, 500, 10000)
+    macros = np.random.randint(-1, len(MACROS), 10000)
+    pmc_bank = SyntheticPMCBank(10000)
+
+    def mirror():
+        counts = neighbourhood_counts(xs, ys, macros, len(MACROS), 500, 500, radius=2)
+        pmc_bank.process_mirror_neurons(counts, xs, ys, own_macros=macros)
+    results['mirror_neurons_10k_500x500'] = _per_call(mirror)
+
+    return {name: {'value': seconds * 1e6, 'unit': "us/call", 'params': {}} for name, seconds in results.items()}
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(quick=False):
+    results = {}
+    for engine, side, population in (QUICK_TICK_CASES if quick else TICK_CASES):
+        name = f"tick_{engine}_{side}x{side}_pop{population}"
+        results[name] = bench_tick_loop(engine, side, population, ticks=5 if quick else 10)
+        print(f"{name}: {results[name]['value']:.2f} ticks/sec")
+    for side, population in BRAIN_CASES[:1] if quick else BRAIN_CASES:
+        name = f"tick_brain_{side}x{side}_pop{population}"
+        results[name] = bench_tick_loop("vectorized", side, population, ticks=5 if quick else 10, brain=True)
+        print(f"{name}: {results[name]['value']:.2f} ticks/sec")
+    for side, population in RECORD_CASES[:1] if quick else RECORD_CASES:
+        name = f"tick_recorded_{side}x{side}_pop{population}"
+        results[name] = bench_tick_loop("vectorized", side, population, ticks=5 if quick else 10, record=True)
+        print(f"{name}: {results[name]['value']:.2f} ticks/sec")
+    for name, row in bench_micro().items():
+        results[name] = row
+        print(f"{name}: {row['value']:.2f} us/call")
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Prints how every shared benchmark moved between two result files.
+    Higher is better for ticks/sec, lower is better for us/call.
+    Returns the names that regressed by more than `threshold`.
+    """
+    regressions = []
+    print(f"Baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')}")
+    for name, row in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        ratio = row['value'] / old['value']
+        speedup = ratio if row['unit'] == "ticks/sec" else 1.0 / ratio
+        flag = ""
+        if speedup < 1.0 - threshold:
+            flag = "  <-- REGRESSION"
+            regressions.append(name)
+        print(f"{name}: {old['value']:.2f} -> {row['value']:.2f} {row['unit']} ({speedup:.2f}x){flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Eden of Shadows performance baseline")
+    parser.add_argument("--out", default="bench_results.json", help="Where to write the results JSON")
+    parser.add_argument("--quick", action="store_true", help="Skip the large-world tick cases")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    report = run_suite(quick=args.quick)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        compare(baseline, report)
@@ -0,0 +1,242 @@
+import numpy as np
+from population import ACTIONS, ACTION_DX, ACTION_DY, STAY, sample_actions
+from pfc import SyntheticPFCBank, FORAGE, HIDE
+from premotor import SyntheticPMCBank, NO_MACRO
+from pmc import SyntheticM1Bank, part_codes
+from profiler import TickProfiler
+
+# The order a tick runs in; any stage can be switched off per run
+STAGES = ("vision", "brainstem", "pfc", "pmc", "m1", "environment")
+
+# One single-step macro per brainstem action: a LEGS push, or FREEZE for Stay
+STEP_MACROS = {
+    action: [(0, "LEGS", (int(dx), int(dy)), 1.0)]
+    for action, dx, dy in zip(ACTIONS, ACTION_DX, ACTION_DY) if action != 'Stay'
+}
+
+WORKING_MEMORY_FOOD = 0 # Working-memory key for "I ate here"
+
+
+class BrainPipeline:
+    """
+    Runs a vectorized EdenOfShadows tick as population-wide stages:
+
+        vision -> brainstem -> pfc -> pmc -> m1 -> environment
+
+    vision      food vision and hunger for every entity (after metabolism)
+    brainstem   BitNet logits for everyone, one sampled action each: the impulse
+    pfc         SyntheticPFCBank tick; entities whose rule is FORAGE try to replace
+                the impulse with the network's most likely action, HIDE with Stay.
+                Inhibition costs energy; a depleted PFC lets the impulse through
+    pmc         actions become macros (a LEGS step, or FREEZE for Stay), optionally
+                mirrored from neighbours, expanded into M1 commands in one batch
+    m1          SyntheticM1Bank: latency, tremor and trips; returns this tick's moves
+    environment moves, movement cost scaled by force, food, deaths and births
+
+    Limbic stress is hunger (0 when fed, 1 when starving) and PFC fatigue is the
+    PMC's cognitive load. With pfc, pmc and m1 off the tick is exactly
+    EdenOfShadows._step_vectorized: same rules, same random draws. Switching
+    off vision blinds everyone, brainstem makes everyone Stay, pmc sends the
+    action straight to M1 as one LEGS command, m1 applies actions with no
+    latency, and environment skips moves, food, deaths and births (metabolism
+    still runs) so only the brain is timed. pmc only runs into m1, so pmc on
+    with m1 off is rejected.
+
+    Every stage's wall time goes to self.profiler (a TickProfiler).
+    """
+    def __init__(self, env, stages=STAGES, mirror_radius=None, rest_amount=1.0, seed=0):
+        if env.population is None:
+            raise ValueError("The brain pipeline needs the vectorized engine")
+        self._check_recorder(env)
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages: {sorted(unknown)}")
+        self.env = env
+        self.enabled = {stage: stage in stages for stage in STAGES}
+        self._check_stages(self.enabled)
+        self.mirror_radius = mirror_radius # None: no mirror neurons
+        self.rest_amount = rest_amount # PFC recovery per tick without inhibition
+        self.profiler = TickProfiler()
+
+        pop = env.population
+        ids = pop.ids[:pop.size]
+        self.pfc = SyntheticPFCBank(len(ids), seed=seed, ids=ids)
+        self.pmc = SyntheticPMCBank(len(ids), ids=ids)
+        self.m1 = SyntheticM1Bank(len(ids), ids=ids)
+        self.action_macros = np.array([
+            self.pmc.macros.index("FREEZE") if action == 'Stay' else self.pmc.define_macro(f"STEP_{action}", STEP_MACROS[action])
+            for action in ACTIONS
+        ])
+        self.ate = np.zeros(len(ids), dtype=bool) # Last tick's eaters, the PFC's goal signal
+
+    def enable(self, stage):
+        self._switch(stage, True)
+
+    def disable(self, stage):
+        self._switch(stage, False)
+
+    def _switch(self, stage, on):
+        enabled = dict(self.enabled)
+        enabled[self._stage(stage)] = on
+        self._check_stages(enabled)
+        self.enabled = enabled
+
+    @staticmethod
+    def _check_stages(enabled):
+        if enabled['pmc'] and not enabled['m1']:
+            raise ValueError("The pmc stage sends its commands to m1; enable m1 too, or disable pmc")
+
+    @staticmethod
+    def _check_recorder(env):
+        # Replay logs hold env.step() ticks; brain ticks move by M1 vectors the log cannot express
+        if env.recorder is not None:
+            raise ValueError("A replay recorder is attached; the brain pipeline's ticks cannot be logged")
+
+    def _stage(self, stage):
+        if stage not in self.enabled:
+            raise ValueError(f"Unknown stage: {stage}")
+        return stage
+
+    def timings(self):
+        """The profiler's report: seconds, calls, ms per tick and share for every stage."""
+        return self.profiler.report()
+
+    def _sync(self):
+        """Brings the banks' rows in line with the population (births, deaths, add_entity)."""
+        pop = self.env.population
+        ids = pop.ids[:pop.size]
+        if len(ids) == len(self.pfc) and np.array_equal(ids, self.pfc.ids):
+            return
+        keep = np.isin(self.pfc.ids, ids, assume_unique=True)
+        born = ids[~np.isin(ids, self.pfc.ids, assume_unique=True)]
+        for bank in (self.pfc, self.pmc, self.m1):
+            bank.compact(keep)
+            bank.add(born)
+        self.ate = np.concatenate([self.ate[keep], np.zeros(len(born), dtype=bool)])
+
+    def step(self):
+        """One tick of the world through every enabled stage; use instead of env.step()."""
+        env = self.env
+        self._check_recorder(env)
+        env.tick_births = env.tick_deaths = env.tick_food_eaten = 0
+        env.tick_actions[:] = 0
+        prof = self.profiler
+        enabled = self.enabled
+        pop = env.population
+        t = prof.start()
+
+        self._sync()
+        env.spawn_food()
+        n = pop.size
+        if n:
+            pop.metabolize()
+            if enabled['vision']:
+                vision = env.food.vision(pop.x[:n], pop.y[:n], radius=1)
+            else:
+                vision = np.zeros((n, 9), dtype=np.uint8)
+            states = pop.states(vision)
+            stress = np.clip(1.0 - pop.calories[:n] / 200.0, 0.0, 1.0)
+            t = prof.lap('vision', t)
+
+            if enabled['brainstem']:
+                logits = pop.forward(states)
+                actions = sample_actions(logits)
+            else:
+                logits = None
+                actions = np.full(n, STAY, dtype=np.int64)
+            t = prof.lap('brainstem', t)
+
+            in_control = np.zeros(n, dtype=bool)
+            if enabled['pfc']:
+                actions, in_control = self._pfc_stage(actions, logits, stress)
+                t = prof.lap('pfc', t)
+
+            if enabled['m1']:
+                if enabled['pmc']:
+                    self._pmc_stage(actions, in_control, stress)
+                    t = prof.lap('pmc', t)
+                else:
+                    self.m1.receive_batch(env.tick, np.arange(n), part_codes(["LEGS"]).repeat(n),
+                                          np.column_stack([ACTION_DX[actions], ACTION_DY[actions]]),
+                                          (actions != STAY).astype(np.float64), stress)
+                positions = np.column_stack([pop.x[:n], pop.y[:n]])
+                # The world wraps; expect the wrapped cell, or every edge crossing would trip
+                vectors, forces = self.m1.execute_tick(env.tick, positions, world_size=(env.width, env.height))
+                t = prof.lap('m1', t)
+            else:
+                vectors = np.column_stack([ACTION_DX[actions], ACTION_DY[actions]])
+                forces = None
+
+            if enabled['environment']:
+                self._environment_stage(actions, vectors, forces)
+        if enabled['environment']:
+            # Reproduction after every entity has acted, children land on the parent's cell
+            env.tick_births = len(pop.reproduce())
+            env._population_index = None
+            self._sync()
+        prof.lap('environment', t)
+        prof.ticks += 1
+
+        env.tick += 1
+        if env.profiler is not None:
+            env.profiler.ticks += 1
+            env.profiler.count('births', env.tick_births)
+            env.profiler.count('deaths', env.tick_deaths)
+            env.profiler.count('food_eaten', env.tick_food_eaten)
+
+    def _pfc_stage(self, impulses, logits, stress):
+        """Top-down modulation of the brainstem's impulses; returns (actions, in_control)."""
+        pfc = self.pfc
+        tick = self.env.tick
+        eaters = np.nonzero(self.ate)[0]
+        pfc.update_working_memory(eaters, np.full(len(eaters), WORKING_MEMORY_FOOD), tick)
+        rules = pfc.tick(tick, stress, self.ate)
+
+        # Logic: FORAGE goes for the likeliest action, HIDE stays put; other rules follow impulses
+        logic = np.where(rules == HIDE, STAY, impulses)
+        if logits is not None:
+            logic = np.where(rules == FORAGE, np.argmax(logits, axis=1), logic)
+        active = logic != impulses
+        strength = np.zeros(len(impulses))
+        if logits is not None and active.any():
+            # The impulse is as strong as the brainstem was sure of it
+            e_x = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+            probs = e_x / e_x.sum(axis=1, keepdims=True)
+            strength = probs[np.arange(len(impulses)), impulses].astype(np.float64)
+        in_control = pfc.top_down_modulate(strength, active)
+        pfc.rest(self.rest_amount, ~active)
+        return np.where(in_control, logic, impulses), in_control
+
+    def _pmc_stage(self, actions, in_control, stress):
+        """Actions to macros (mirroring neighbours if enabled), expanded into M1 in one batch."""
+        env, pmc = self.env, self.pmc
+        macros = self.action_macros[actions]
+        if self.mirror_radius is not None:
+            counts = env.macro_histogram(macros, len(pmc.macros), self.mirror_radius)
+            xs, ys = env.positions()
+            mirrored = pmc.process_mirror_neurons(counts, xs, ys, own_macros=macros)
+            # Mirror neurons only move entities their PFC is not steering
+            follow = ~in_control & (mirrored != NO_MACRO)
+            macros[follow] = mirrored[follow]
+        load = self.pfc.get_fatigue_level() if self.enabled['pfc'] else 0.0
+        pmc.prepare_macros(env.tick, np.arange(len(macros)), macros, load, stress, self.m1)
+
+    def _environment_stage(self, actions, vectors, forces):
+        """Applies the moves, then food and deaths, as EdenOfShadows._step_vectorized does."""
+        env = self.env
+        pop = env.population
+        n = pop.size
+        if forces is None:
+            pop.move(actions, env.width, env.height)
+        else:
+            # Energy burned follows the force M1 actually used
+            pop.calories[:n] -= pop.movement_cost[:n] * forces
+            pop.x[:n] = (pop.x[:n] + vectors[:, 0]) % env.width
+            pop.y[:n] = (pop.y[:n] + vectors[:, 1]) % env.height
+        env.tick_actions[:] = np.bincount(actions, minlength=len(ACTIONS))
+        eaters = pop.eat(env.food.cells)
+        env.food.remove_many(pop.x[eaters], pop.y[eaters])
+        env.tick_food_eaten = len(eaters)
+        self.ate = np.zeros(n, dtype=bool)
+        self.ate[eaters] = True
+        env.tick_deaths = pop.cull()
@@ -0,0 +1,148 @@
+import json
+import os
+import random
+import multiprocessing as mp
+from functools import partial
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+
+DEFAULT_CONFIG = {
+    'width': 50,
+    'height': 50,
+    'max_food': 100,
+    'initial_population': 10,
+    'ticks': 1000,
+    'engine': "object",
+}
+
+SUMMARY_METRICS = ('extinction_tick', 'final_population', 'peak_population', 'final_food', 'ticks_run')
+
+
+def seed_streams(seed):
+    """Seeds both global RNGs (random + np.random) from independent SeedSequence streams."""
+    py_state, np_state = np.random.SeedSequence(seed).generate_state(2)
+    random.seed(int(py_state))
+    np.random.seed(int(np_state))
+
+
+def run_world(seed, config=None):
+    """One independent EdenOfShadows run; returns its summary dict."""
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    seed_streams(seed)
+
+    env = EdenOfShadows(
+        width=config['width'], height=config['height'],
+        max_food=config['max_food'], engine=config['engine']
+    )
+    for _ in range(config['initial_population']):
+        env.add_entity(LiminalEntity(calories=200))
+
+    extinction_tick = None
+    peak = len(env.entities)
+    t = 0
+    for t in range(config['ticks']):
+        env.step()
+        pop_size = len(env.entities)
+        peak = max(peak, pop_size)
+        if pop_size == 0:
+            extinction_tick = t
+            break
+
+    return {
+        'seed': seed,
+        'config': config,
+        'extinction_tick': extinction_tick,
+        'final_population': len(env.entities),
+        'peak_population': peak,
+        'final_food': len(env.food),
+        'ticks_run': t + 1,
+    }
+
+
+def load_results(path, config=None):
+    """Completed summaries for `config` from an ensemble results file, keyed by seed."""
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                summary = json.loads(line)
+            except json.JSONDecodeError:
+                continue # Torn final line from an interrupted run
+            if summary.get('config') == config:
+                done[summary['seed']] = summary
+    return done
+
+
+def _trim_torn_tail(path, block=1 << 16):
+    """Truncates `path` back to its last newline, dropping a line torn by a crash."""
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos < end:
+            f.truncate(pos)
+
+
+def run_ensemble(seeds, config=None, workers=None, results_path=None, resume=True, on_result=None):
+    """
+    Fans independent runs out over a process pool.
+    Each finished run is appended to results_path (one JSON line) as soon as it
+    arrives, so an interrupted ensemble resumes from where it stopped when called
+    again with resume=True. With resume=False an existing results_path is moved
+    aside to results_path + ".prev" (replacing any older one) and the ensemble
+    starts a new file. on_result(summary) is called for every new summary.
+    Returns all summaries for the requested seeds, ordered by seed.
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    if results_path and not resume and os.path.exists(results_path):
+        os.replace(results_path, results_path + ".prev")
+    done = load_results(results_path, config) if (results_path and resume) else {}
+    todo = [seed for seed in seeds if seed not in done]
+
+    if todo:
+        if results_path and os.path.exists(results_path):
+            # Appending after a torn line would glue the next summary onto it
+            _trim_torn_tail(results_path)
+        out = open(results_path, 'a') if results_path else None
+        try:
+            with mp.Pool(workers) as pool:
+                for summary in pool.imap_unordered(partial(run_world, config=config), todo):
+                    done[summary['seed']] = summary
+                    if out is not None:
+                        out.write(json.dumps(summary) + "\n")
+                        out.flush()
+                    if on_result is not None:
+                        on_result(summary)
+        finally:
+            if out is not None:
+                out.close()
+
+    return [done[seed] for seed in sorted(set(seeds))]
+
+
+def aggregate(summaries, percentiles=(5, 25, 50, 75, 95)):
+    """Percentiles of every summary metric across runs, plus the extinction rate."""
+    report = {'runs': len(summaries)}
+    if not summaries:
+        return report
+    extinct = [s['extinction_tick'] for s in summaries if s['extinction_tick'] is not None]
+    report['extinction_rate'] = len(extinct) / len(summaries)
+    for metric in SUMMARY_METRICS:
+        values = extinct if metric == 'extinction_tick' else [s[metric] for s in summaries]
+        if values:
+            report[metric] = dict(zip(
+                (f"p{p}" for p in percentiles),
+                np.percentile(values, percentiles).tolist()
+            ))
+    return report
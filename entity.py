@@ -3,7 +3,7 @@ import numpy as np
 from evolution import BitNetGenome
 
 class LiminalEntity:
-    def __init__(self, calories=200, genome=None):
+    def __init__(self, calories=200, genome=None, packed_genome=False):
         self.calories = calories
         self.x = 0
         self.y = 0
@@ -14,26 +14,42 @@ class LiminalEntity:
         
         # BitNet Architecture: 10 inputs (3x3 vision + 1 calorie scalar) -> 16 hidden -> 5 outputs (N,E,S,W,Stay)
         layer_sizes = [10, 16, 5]
-        self.genome = BitNetGenome(layer_sizes=layer_sizes, parent_genes=genome)
+        if isinstance(genome, BitNetGenome):
+            # Already-built offspring genome (e.g. from evolution.breed), used as is
+            self.genome = genome
+        else:
+            # packed_genome stores weights at 2 bits each; children of packed parents stay packed
+            self.genome = BitNetGenome(layer_sizes=layer_sizes, parent_genes=genome, packed=packed_genome)
         
     def act(self, environment):
         """
         The Brainstem decision loop, driven by purely ternary neural network.
+        Returns the chosen action ('N', 'E', 'S', 'W' or 'Stay').
         """
         self.calories -= self.metabolism
         
         # Build neural network input state
         vision = environment.get_local_vision(self.x, self.y, radius=1)
-        # Normalize calories to act as an internal "hunger" scalar.
-        caloric_score = self.calories / 200.0
-        
-        state = np.array(vision + [caloric_score])
-        
-        # Forward pass returning Float32 logits
-        logits = self.genome.forward(state)
-        # Softmax conversion to probability distribution
-        e_x = np.exp(logits - np.max(logits))
-        probs = e_x / e_x.sum()
+
+        # A compiled policy table replaces the forward pass with a lookup
+        table = environment.policy_table(self.genome)
+        probs = table.lookup(vision, self.calories) if table is not None else None
+        if probs is None:
+            # Normalize calories to act as an internal "hunger" scalar.
+            caloric_score = self.calories / 200.0
+
+            state = vision + [caloric_score]
+
+            if self.genome.packed:
+                # Packed genomes run straight off their packed bytes (PackedBitNetLayer.forward);
+                # a fused kernel would hold an unpacked copy of the weights per genome
+                logits = self.genome.forward(np.array(state))
+            else:
+                # Integer-only forward pass, bit-identical to genome.forward's float32 logits
+                logits = np.array(environment.fused_kernel(self.genome).forward(state), dtype=np.float32)
+            # Softmax conversion to probability distribution
+            e_x = np.exp(logits - np.max(logits))
+            probs = e_x / e_x.sum()
         
         actions = ['N', 'E', 'S', 'W', 'Stay']
         action = np.random.choice(actions, p=probs)
@@ -51,11 +67,5 @@ class LiminalEntity:
         # Check if we landed on food
         if environment.check_food_collision(self):
             self.calories += 100 # Food value
-            
-    def try_reproduce(self):
-        # Asexual splitting if energy is high enough
-        if self.calories > 200:
-            self.calories -= 100 # Cost of splitting
-            child = LiminalEntity(calories=200, genome=self.genome.get_genes())
-            return child
-        return None
+
+        return action
@@ -1,12 +1,105 @@
 import random
+import numpy as np
+from food import FoodGrid
+from spatial import EntityRegistry, SpatialHash, PopulationIndex, neighbourhood_counts
+from population import Population, ACTIONS, sample_actions, REPRODUCE_THRESHOLD, REPRODUCE_COST, BIRTH_CALORIES
+from profiler import TickProfiler
+from evolution import BitNetGenome, FusedBitNet, GenomePool, PolicyTable, breed
+from entity import LiminalEntity
 
 class EdenOfShadows:
-    def __init__(self, width=50, height=50, max_food=100):
+    def __init__(self, width=50, height=50, max_food=100, engine="object", mutation_rates=None):
+        """
+        engine="object" steps a list of LiminalEntity objects one at a time.
+        engine="vectorized" keeps the population in a struct-of-arrays Population
+        and runs each tick as a handful of whole-population NumPy passes.
+        mutation_rates: per-weight resampling chance at birth, one number or one
+        per BitNet layer (default evolution.MUTATION_RATE everywhere).
+        """
+        if engine not in ("object", "vectorized"):
+            raise ValueError(f"Unknown engine: {engine}")
         self.width = width
         self.height = height
         self.max_food = max_food
-        self.entities = []
-        self.food = set()
+        self.engine = engine
+        self.mutation_rates = mutation_rates
+        self.tick = 0 # Completed steps
+
+        # What happened during the most recent step
+        self.tick_births = 0
+        self.tick_deaths = 0
+        self.tick_food_eaten = 0
+        self.tick_actions = np.zeros(len(ACTIONS), dtype=np.int64) # counts per N, E, S, W, Stay
+
+        # Per-phase timing; None means profiling is off and step() skips all instrumentation
+        self.profiler = None
+        # width x height bitmap with the old set-of-tuples interface
+        self.food = FoodGrid(width, height)
+
+        # Stable IDs + O(1) swap-remove, and a bucketed index for "who is near (x, y)"
+        self._entities = EntityRegistry()
+        self.spatial = SpatialHash(width, height)
+        self.population = Population(mutation_rates=mutation_rates) if engine == "vectorized" else None
+        self._population_index = None
+        # Object engine: identical genomes share one read-only set of weights
+        self.genome_pool = GenomePool() if engine == "object" else None
+        # PolicyTable settings once compile_policies() is called; None runs the network every act
+        self.policy_settings = None
+        # (macro, height, width) neighbourhood counts from the last macro_histogram() call
+        self.macro_counts = None
+        # ReplayRecorder logging every vectorized tick's events; None records nothing
+        self.recorder = None
+
+    def enable_profiling(self, profiler=None):
+        """Starts accumulating per-phase timings into `profiler` (a fresh TickProfiler by default)."""
+        self.profiler = profiler or TickProfiler()
+        return self.profiler
+
+    def compile_policies(self, calorie_buckets=64, max_calories=320):
+        """
+        Object engine: act() reads action probabilities from a per-genome
+        PolicyTable instead of running the network. Tables sit in the genome
+        pool's shared cache, so identical genomes share one and it is dropped
+        when the last entity carrying that genome dies.
+        """
+        if self.genome_pool is None:
+            raise ValueError("Policy tables need the object engine")
+        self.policy_settings = {'calorie_buckets': calorie_buckets, 'max_calories': max_calories}
+
+    def policy_table(self, genome):
+        """The compiled PolicyTable for `genome`, or None when compilation is off."""
+        if self.policy_settings is None or genome not in self.genome_pool:
+            return None
+        cache = self.genome_pool.cache(genome)
+        table = cache.get('policy')
+        if table is None:
+            table = cache['policy'] = PolicyTable(genome, **self.policy_settings)
+        return table
+
+    def fused_kernel(self, genome):
+        """
+        The FusedBitNet for `genome`. Pooled genomes share one kernel per unique
+        set of weights in the pool's cache, dropped with the entry on eviction.
+        """
+        if self.genome_pool is None or genome not in self.genome_pool:
+            return genome.fused()
+        cache = self.genome_pool.cache(genome)
+        kernel = cache.get('fused')
+        if kernel is None:
+            kernel = cache['fused'] = FusedBitNet(genome)
+        return kernel
+
+    def disable_profiling(self):
+        """Stops profiling; returns the profiler so its numbers can still be read."""
+        profiler, self.profiler = self.profiler, None
+        return profiler
+
+    @property
+    def entities(self):
+        if self.population is not None:
+            # Thin EntityViews over the population arrays
+            return self.population.views()
+        return self._entities
         
     def add_entity(self, entity, x=None, y=None):
         if x is None or y is None:
@@ -14,58 +107,221 @@ class EdenOfShadows:
             y = random.randint(0, self.height - 1)
         entity.x = x
         entity.y = y
-        self.entities.append(entity)
+        if self.population is not None:
+            # The entity's state is copied into the arrays; use env.entities for live views
+            entity.id = int(self.population.add(entity, x, y))
+            self._population_index = None
+        else:
+            self.genome_pool.intern(entity.genome)
+            self._entities.add(entity)
+            self.spatial.insert(entity)
+
+    def remove_entity(self, entity):
+        if self.population is not None:
+            self.population.alive[entity._index] = False
+            self.population.compact()
+            self._population_index = None
+        else:
+            self._entities.remove(entity)
+            self.spatial.remove(entity)
+            self.genome_pool.release(entity.genome)
+
+    def unique_genomes(self):
+        """How many distinct weight sets are alive right now."""
+        if self.population is not None:
+            pop = self.population
+            if pop.size == 0:
+                return 0
+            flat = np.concatenate([w[:pop.size].reshape(pop.size, -1) for w in pop.weights], axis=1)
+            return len(np.unique(flat, axis=0))
+        return self.genome_pool.unique
+
+    def get_entity(self, entity_id):
+        """Looks an entity up by its stable ID; None if it is dead."""
+        if self.population is not None:
+            pop = self.population
+            slot = int(np.searchsorted(pop.ids[:pop.size], entity_id))
+            if slot < pop.size and pop.ids[slot] == entity_id:
+                return pop.views()[slot]
+            return None
+        return self._entities.get(entity_id)
+
+    def _index(self):
+        if self._population_index is None:
+            pop = self.population
+            self._population_index = PopulationIndex(
+                pop.x[:pop.size].copy(), pop.y[:pop.size].copy(), self.width, self.height
+            )
+        return self._population_index
+
+    def entities_near(self, x, y, radius):
+        """Entities within Chebyshev distance `radius` of (x, y) on the torus."""
+        if self.population is not None:
+            views = self.population.views()
+            return [views[slot] for slot in self._index().query_radius(x, y, radius).tolist()]
+        return self.spatial.query_radius(x, y, radius)
+
+    def entities_at(self, x, y):
+        """Entities sharing the grid cell (x, y)."""
+        if self.population is not None:
+            views = self.population.views()
+            return [views[slot] for slot in self._index().query_cell(x, y).tolist()]
+        return self.spatial.query_cell(x, y)
+        
+    def positions(self):
+        """(xs, ys) int arrays in env.entities order."""
+        if self.population is not None:
+            pop = self.population
+            return pop.x[:pop.size], pop.y[:pop.size]
+        entities = self._entities
+        return (np.fromiter((e.x for e in entities), dtype=np.int64, count=len(entities)),
+                np.fromiter((e.y for e in entities), dtype=np.int64, count=len(entities)))
+
+    def macro_histogram(self, macros, n_macros, radius=2):
+        """
+        Counts, for every cell, the entities within Chebyshev distance `radius`
+        performing each macro: a (n_macros, height, width) tensor, also kept in
+        self.macro_counts. `macros` holds one macro code per entity in
+        env.entities order (-1 for none). Meant to be built once per tick so
+        every mirror-neuron decision is a lookup instead of a neighbour scan.
+        """
+        xs, ys = self.positions()
+        self.macro_counts = neighbourhood_counts(xs, ys, macros, n_macros, self.width, self.height, radius)
+        return self.macro_counts
         
     def spawn_food(self):
-        # Replenish food up to max_food
-        while len(self.food) < self.max_food:
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            self.food.add((x, y))
+        # Replenish food up to max_food; returns the flat indices of the new food cells
+        return self.food.spawn(self.max_food)
             
     def get_local_vision(self, x, y, radius=1):
         # Returns a simple list of what's nearby: 1 for food, 0 for empty
         # (For now, we just detect food to keep the Brainstem simple)
-        vision = []
-        for dy in range(-radius, radius + 1):
-            for dx in range(-radius, radius + 1):
-                nx, ny = (x + dx) % self.width, (y + dy) % self.height
-                if (nx, ny) in self.food:
-                    vision.append(1)
-                else:
-                    vision.append(0)
-        return vision
+        return self.food.local_vision(x, y, radius)
+
+    def get_local_vision_bulk(self, xs, ys, radius=1):
+        """Vision for many positions at once: an (N, (2r+1)^2) uint8 matrix."""
+        return self.food.vision(xs, ys, radius)
 
     def move_entity(self, entity, dx, dy):
         # Toroidal grid (wraps around)
         entity.x = (entity.x + dx) % self.width
         entity.y = (entity.y + dy) % self.height
+        if self.population is not None:
+            self._population_index = None
+        else:
+            self.spatial.move(entity)
         
     def check_food_collision(self, entity):
         pos = (entity.x, entity.y)
         if pos in self.food:
             self.food.remove(pos)
+            self.tick_food_eaten += 1
             return True
         return False
 
     def step(self):
+        self.tick_births = 0
+        self.tick_deaths = 0
+        self.tick_food_eaten = 0
+        self.tick_actions[:] = 0
+
+        if self.population is not None:
+            self._step_vectorized()
+        else:
+            self._step_objects()
+        self.tick += 1
+        if self.recorder is not None:
+            self.recorder.checkpoint(self)
+
+        prof = self.profiler
+        if prof is not None:
+            prof.ticks += 1
+            prof.count('births', self.tick_births)
+            prof.count('deaths', self.tick_deaths)
+            prof.count('food_eaten', self.tick_food_eaten)
+
+    def _step_objects(self):
+        prof = self.profiler
+        t = prof.start() if prof else None
+
         self.spawn_food()
+        if prof: t = prof.lap('spawn_food', t)
         
-        # Entities take action
-        for entity in list(self.entities): # Copy list for safe removal
-            entity.act(self)
+        # Entities take action (vision, forward pass and sampling happen inside act)
+        action_counts = dict.fromkeys(ACTIONS, 0)
+        dead = []
+        for entity in list(self._entities): # Copy list for safe removal
+            action_counts[entity.act(self)] += 1
             
             # Check survival
             if entity.calories <= 0:
-                self.entities.remove(entity)
-                
-        # Handle reproduction (after all actions to avoid modifying list during iteration)
-        new_entities = []
-        for entity in self.entities:
-            child = entity.try_reproduce()
-            if child:
-                # Spawn child near parent
-                new_entities.append((child, entity.x, entity.y))
+                dead.append(entity)
+        self.tick_actions[:] = list(action_counts.values())
+        if prof: t = prof.lap('act', t)
+
+        for entity in dead:
+            self.remove_entity(entity)
+        self.tick_deaths = len(dead)
+        if prof: t = prof.lap('death', t)
                 
-        for child, x, y in new_entities:
-            self.add_entity(child, x, y)
+        # Handle reproduction (after all actions to avoid modifying list during iteration).
+        # Asexual splitting above REPRODUCE_THRESHOLD; every child of the tick is bred in one batch
+        parents = [entity for entity in self._entities if entity.calories > REPRODUCE_THRESHOLD]
+        offspring = iter(breed([p.genome for p in parents if not p.genome.packed], self.mutation_rates))
+        for parent in parents:
+            parent.calories -= REPRODUCE_COST
+            if parent.genome.packed:
+                genome = BitNetGenome(parent.genome.layer_sizes, parent.genome.get_genes(),
+                                      mutation_rates=self.mutation_rates)
+            else:
+                genome = next(offspring)
+            # Spawn child near parent
+            self.add_entity(LiminalEntity(calories=BIRTH_CALORIES, genome=genome), parent.x, parent.y)
+        self.tick_births = len(parents)
+        if prof: prof.lap('reproduction', t)
+
+    def _step_vectorized(self):
+        """
+        Same rules as the object engine, applied to the whole population at once.
+        Every entity decides from the food layout at the start of the tick; when
+        several land on the same food cell, the lowest slot (oldest entity) eats it.
+        """
+        prof = self.profiler
+        rec = self.recorder
+        t = prof.start() if prof else None
+
+        spawned = self.spawn_food()
+        if prof: t = prof.lap('spawn_food', t)
+        pop = self.population
+        actions = dead = None
+
+        if pop.size:
+            pop.metabolize()
+            # Vision + hunger scalar, same layout as LiminalEntity.act
+            vision = self.food.vision(pop.x[:pop.size], pop.y[:pop.size], radius=1)
+            states = pop.states(vision)
+            if prof: t = prof.lap('vision', t)
+            logits = pop.forward(states)
+            if prof: t = prof.lap('forward', t)
+            actions = sample_actions(logits)
+            if prof: t = prof.lap('sampling', t)
+
+            pop.move(actions, self.width, self.height)
+            self.tick_actions[:] = np.bincount(actions, minlength=len(ACTIONS))
+            eaters = pop.eat(self.food.cells)
+            self.food.remove_many(pop.x[eaters], pop.y[eaters])
+            self.tick_food_eaten = len(eaters)
+            if prof: t = prof.lap('move_eat', t)
+
+            if rec is not None:
+                dead = pop.ids[:pop.size][pop.calories[:pop.size] <= 0]
+            self.tick_deaths = pop.cull()
+            if prof: t = prof.lap('death', t)
+
+        # Reproduction after every entity has acted, children land on the parent's cell
+        self.tick_births = len(pop.reproduce())
+        self._population_index = None
+        if prof: t = prof.lap('reproduction', t)
+        if rec is not None:
+            rec.record(self, spawned, actions, dead)
+            if prof: prof.lap('replay_log', t)
@@ -0,0 +1,95 @@
+import numpy as np
+
+def gather_vision(cells, xs, ys, radius=1):
+    """
+    Wrapped (2r+1)^2 neighbourhood gather from a food bitmap for every (x, y) at once.
+    Rows are dy-major, dx-minor, matching EdenOfShadows.get_local_vision.
+    """
+    height, width = cells.shape
+    offsets = np.arange(-radius, radius + 1)
+    rows = (np.asarray(ys)[:, None, None] + offsets[None, :, None]) % height
+    cols = (np.asarray(xs)[:, None, None] + offsets[None, None, :]) % width
+    return cells[rows, cols].reshape(len(rows), -1).view(np.uint8)
+
+class FoodGrid:
+    """
+    Food stored as a height x width occupancy bitmap (cells[y, x]).
+    Keeps the set-of-(x, y) interface EdenOfShadows.food used to have, so
+    `len(env.food)`, `(x, y) in env.food` and iteration still work.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = np.zeros((height, width), dtype=bool)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, pos):
+        x, y = pos
+        return bool(self.cells[y, x])
+
+    def __iter__(self):
+        ys, xs = np.nonzero(self.cells)
+        return zip(xs.tolist(), ys.tolist())
+
+    def add(self, pos):
+        x, y = pos
+        if not self.cells[y, x]:
+            self.cells[y, x] = True
+            self.count += 1
+
+    def remove(self, pos):
+        x, y = pos
+        if not self.cells[y, x]:
+            raise KeyError(pos)
+        self.cells[y, x] = False
+        self.count -= 1
+
+    def discard(self, pos):
+        if pos in self:
+            self.remove(pos)
+
+    def clear(self):
+        self.cells[:] = False
+        self.count = 0
+
+    def remove_many(self, xs, ys):
+        """Clears a batch of distinct, currently occupied cells."""
+        self.cells[ys, xs] = False
+        self.count -= len(xs)
+
+    def spawn(self, max_food):
+        """
+        Replenish food up to max_food with uniformly random cells.
+        Same distribution as drawing one cell at a time until full (repeats are
+        simply absorbed), but drawn in batches of the remaining deficit.
+        Returns the flat (y * width + x) indices of the cells that became food.
+        """
+        spawned = []
+        while self.count < max_food:
+            deficit = max_food - self.count
+            xs = np.random.randint(0, self.width, size=deficit)
+            ys = np.random.randint(0, self.height, size=deficit)
+            flat = ys * self.width + xs
+            spawned.append(np.unique(flat[~self.cells.reshape(-1)[flat]]))
+            self.cells[ys, xs] = True
+            self.count = int(np.count_nonzero(self.cells))
+        return np.concatenate(spawned) if spawned else np.zeros(0, dtype=np.int64)
+
+    def vision(self, xs, ys, radius=1):
+        """
+        Bulk neighbourhood lookup on the toroidal grid.
+        Returns an (N, (2r+1)^2) uint8 matrix in the row-major order of
+        EdenOfShadows.get_local_vision (dy outer, dx inner).
+        """
+        return gather_vision(self.cells, xs, ys, radius)
+
+    def local_vision(self, x, y, radius=1):
+        """Scalar neighbourhood lookup as a list of 0/1 ints."""
+        if radius <= x < self.width - radius and radius <= y < self.height - radius:
+            # Interior cells need no wrapping: read the window as one slice
+            window = self.cells[y - radius:y + radius + 1, x - radius:x + radius + 1]
+            return window.ravel().view(np.uint8).tolist()
+        return self.vision([x], [y], radius)[0].tolist()
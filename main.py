@@ -1,19 +1,68 @@
 import time
+import argparse
 from environment import EdenOfShadows
 from entity import LiminalEntity
+from ensemble import run_ensemble, aggregate
+from telemetry import TelemetrySink
+from brain import BrainPipeline, STAGES
+from observer import ObservationServer
+from replay import ReplayRecorder
 
-def main():
+def main_ensemble(args):
+    print(f"Starting Eden of Shadows ensemble - {args.seeds} seeds on {args.workers or 'all'} workers")
+    config = {'ticks': args.ticks, 'engine': args.engine}
+
+    def report(summary):
+        fate = f"extinct at tick {summary['extinction_tick']}" if summary['extinction_tick'] is not None \
+            else f"population {summary['final_population']}"
+        print(f"Seed {summary['seed']}: {fate} | Food Available: {summary['final_food']}")
+
+    summaries = run_ensemble(
+        range(args.seeds), config=config, workers=args.workers,
+        results_path=args.out, resume=not args.fresh, on_result=report
+    )
+    stats = aggregate(summaries)
+    print(f"\nRuns: {stats['runs']} | Extinction rate: {stats.get('extinction_rate', 0):.1%}")
+    for metric, pct in stats.items():
+        if isinstance(pct, dict):
+            print(f"{metric}: " + " | ".join(f"{k}={v:.1f}" for k, v in pct.items()))
+
+def main(ticks=1000, engine="object", telemetry_path=None, profile_path=None, policy_buckets=0,
+         brain_stages=None, mirror_radius=None, serve_port=None, record_path=None, keyframe_every=1000):
     print("Starting Eden of Shadows - MVP Simulation")
-    env = EdenOfShadows(width=50, height=50, max_food=100)
+    env = EdenOfShadows(width=50, height=50, max_food=100, engine=engine)
+    if policy_buckets:
+        env.compile_policies(calorie_buckets=policy_buckets)
+    # Full per-tick time series go to a columnar file; stdout keeps the 10-tick summary
+    telemetry = TelemetrySink(telemetry_path) if telemetry_path else None
+    if profile_path:
+        env.enable_profiling()
     
     # Initialize with 10 random "Adam/Eve" entities
     for _ in range(10):
         e = LiminalEntity(calories=200)
         env.add_entity(e)
+
+    # Live frames for any number of observers (visualize.py --connect); never blocks the loop
+    server = ObservationServer(port=serve_port).start() if serve_port is not None else None
+    if server is not None:
+        print(f"Serving observation frames on 127.0.0.1:{server.port}")
+
+    # Event log of every tick plus periodic keyframes, for seeking with replay.ReplayLog
+    recorder = ReplayRecorder(env, record_path, keyframe_every=keyframe_every) if record_path else None
+
+    # The staged brain (PFC, PMC, M1) drives the tick instead of the bare brainstem
+    brain = BrainPipeline(env, stages=brain_stages, mirror_radius=mirror_radius) if brain_stages else None
         
-    ticks = 1000
     for t in range(ticks):
-        env.step()
+        if brain is not None:
+            brain.step()
+        else:
+            env.step()
+        if telemetry is not None:
+            telemetry.record(env)
+        if server is not None:
+            server.publish(env)
         
         pop_size = len(env.entities)
         
@@ -26,13 +75,52 @@ def main():
             
         # time.sleep(0.01) # Uncomment to watch it slower
 
+    if telemetry is not None:
+        telemetry.close()
+    if server is not None:
+        server.close()
+    if recorder is not None:
+        recorder.close()
     print("Simulation Complete.")
+    if profile_path:
+        env.profiler.dump(profile_path)
+        print(env.profiler.format())
+    if brain is not None:
+        print(brain.profiler.format())
     final_pop = len(env.entities)
     print(f"Final Population: {final_pop}")
+    print(f"Unique genomes alive: {env.unique_genomes()}")
     
     # Analyze final genomes of survivors to see if evolution occurred
     if final_pop > 0:
         print("\nTernary BitNet1.58 models successfully evolved and survived!")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Eden of Shadows simulation")
+    parser.add_argument("--seeds", type=int, default=0, help="Run an ensemble of this many seeds instead of one world")
+    parser.add_argument("--workers", type=int, default=None, help="Ensemble worker processes (default: all cores)")
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--engine", choices=["object", "vectorized"], default="object")
+    parser.add_argument("--out", default=None, help="Append per-run summaries to this JSON-lines file (enables resume)")
+    parser.add_argument("--fresh", action="store_true", help="Rerun every seed, moving an existing --out file aside to <out>.prev")
+    parser.add_argument("--telemetry", default=None, help="Write per-tick metrics of a single run to this columnar file")
+    parser.add_argument("--profile", default=None, help="Profile tick phases of a single run and dump them to this JSON file")
+    parser.add_argument("--policy-buckets", type=int, default=0, help="Object engine: act from policy tables with this many calorie buckets (0 = exact network)")
+    parser.add_argument("--brain", default=None, help="Vectorized engine: tick through the brain pipeline with these comma-separated stages, or 'all'")
+    parser.add_argument("--mirror-radius", type=int, default=None, help="Brain pipeline: mirror neighbours' macros within this radius")
+    parser.add_argument("--serve", type=int, default=None, help="Publish live frames on this local port (0 = any free port)")
+    parser.add_argument("--record", default=None, help="Vectorized engine: write a replay log of every tick to this file")
+    parser.add_argument("--keyframe-every", type=int, default=1000, help="Replay log: save a full keyframe every this many ticks")
+    args = parser.parse_args()
+    if args.record and args.brain:
+        parser.error("--record logs env.step() ticks and cannot follow the brain pipeline")
+
+    if args.seeds:
+        main_ensemble(args)
+    else:
+        brain_stages = None
+        if args.brain:
+            brain_stages = STAGES if args.brain == "all" else tuple(args.brain.split(","))
+        main(ticks=args.ticks, engine=args.engine, telemetry_path=args.telemetry, profile_path=args.profile,
+             policy_buckets=args.policy_buckets, brain_stages=brain_stages, mirror_radius=args.mirror_radius,
+             serve_port=args.serve, record_path=args.record, keyframe_every=args.keyframe_every)
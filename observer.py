@@ -0,0 +1,276 @@
+import asyncio
+import socket
+import struct
+import threading
+import zlib
+import numpy as np
+
+# Wire format, one frame per published tick a client keeps up with:
+#   HEADER | zlib(food bits) | xs uint16[n] | ys uint16[n] | calories float32[n]
+# Food bits are the row-major packbits of the height x width food bitmap. In a
+# delta frame they are XORed with the food bits of the client's previous frame
+# (base_seq), so a tick where a few cells changed compresses to a few bytes.
+# `dropped` is how many published frames this client skipped since its last one.
+MAGIC = b"EDOB"
+KEYFRAME, DELTA = 0, 1
+HEADER = struct.Struct('<4sBIIqHHIIIII5III')
+# magic, kind, seq, base_seq, tick, width, height, population,
+# births, deaths, food, food_eaten, actions N/E/S/W/Stay, dropped, food bytes (compressed)
+
+
+class FrameSlot:
+    """One side of the double buffer: preallocated copies of what a frame shows."""
+    def __init__(self):
+        self.seq = 0
+        self.food = None
+        self.xs = np.zeros(0, dtype=np.uint16)
+        self.ys = np.zeros(0, dtype=np.uint16)
+        self.calories = np.zeros(0, dtype=np.float32)
+        self.size = 0
+        self.meta = None
+
+    def capture(self, env, seq):
+        if self.food is None or self.food.shape != env.food.cells.shape:
+            self.food = np.empty_like(env.food.cells)
+        np.copyto(self.food, env.food.cells)
+        xs, ys = env.positions()
+        n = len(xs)
+        if n > len(self.xs):
+            capacity = max(n, 2 * len(self.xs), 64)
+            self.xs = np.zeros(capacity, dtype=np.uint16)
+            self.ys = np.zeros(capacity, dtype=np.uint16)
+            self.calories = np.zeros(capacity, dtype=np.float32)
+        self.xs[:n] = xs
+        self.ys[:n] = ys
+        if env.population is not None:
+            self.calories[:n] = env.population.calories[:n]
+        else:
+            self.calories[:n] = [e.calories for e in env.entities]
+        self.size = n
+        self.seq = seq
+        self.meta = (env.tick, env.width, env.height, n, env.tick_births, env.tick_deaths,
+                     len(env.food), env.tick_food_eaten) + tuple(int(a) for a in env.tick_actions)
+
+
+class DoubleBuffer:
+    """
+    The simulation writes the back slot, then swap() publishes it in O(1).
+    The reader takes the newest published slot with acquire(), which trades it
+    for the reader's own spare slot, so the simulation never writes a slot the
+    reader is still encoding and neither side waits on the other.
+    Frames published faster than the reader acquires them are simply replaced.
+    """
+    def __init__(self):
+        self.back, self.front, self._spare = FrameSlot(), FrameSlot(), FrameSlot()
+        self._lock = threading.Lock()
+        self._fresh = False
+        self.seq = 0
+
+    def capture(self, env):
+        self.back.capture(env, self.seq + 1)
+
+    def swap(self):
+        with self._lock:
+            self.back, self.front = self.front, self.back
+            self._fresh = True
+            self.seq += 1
+
+    def acquire(self):
+        """The newest published slot, or None if nothing new was published since the last call."""
+        with self._lock:
+            if not self._fresh:
+                return None
+            self.front, self._spare = self._spare, self.front
+            self._fresh = False
+            return self._spare
+
+
+class Snapshot:
+    """An acquired frame encoded once into immutable pieces shared by every client."""
+    def __init__(self, slot):
+        n = slot.size
+        self.seq = slot.seq
+        self.meta = slot.meta
+        self.food_bits = np.packbits(slot.food.ravel())
+        self.keyframe_food = zlib.compress(self.food_bits.tobytes(), 1)
+        self.entities = slot.xs[:n].tobytes() + slot.ys[:n].tobytes() + slot.calories[:n].tobytes()
+        self._deltas = {} # base seq -> compressed XOR, shared by clients on the same base
+
+    def encode(self, base, dropped):
+        """This frame for a client whose last frame was `base` (None: send a keyframe)."""
+        if base is None:
+            kind, base_seq, food = KEYFRAME, 0, self.keyframe_food
+        else:
+            kind, base_seq = DELTA, base.seq
+            food = self._deltas.get(base_seq)
+            if food is None:
+                food = self._deltas[base_seq] = zlib.compress((self.food_bits ^ base.food_bits).tobytes(), 1)
+        header = HEADER.pack(MAGIC, kind, self.seq, base_seq, *self.meta, dropped, len(food))
+        return header + food + self.entities
+
+
+class ObservationServer:
+    """
+    Local TCP server publishing world frames to any number of observers.
+
+    The simulation calls publish(env) at the end of each tick: a copy into the
+    back buffer and an O(1) swap, never a socket operation. An asyncio loop on
+    a background thread encodes the newest frame once and hands it to every
+    client. Frames published faster than the loop picks them up are replaced,
+    and a client with more than `max_buffered` bytes still queued skips frames
+    instead of queueing more, so slow or vanished clients cost the simulation
+    nothing. Each client gets a keyframe first, then deltas against the last
+    frame it received.
+    """
+    def __init__(self, host="127.0.0.1", port=0, max_buffered=1 << 20):
+        self.host = host
+        self.port = port
+        self.max_buffered = max_buffered
+        self.buffer = DoubleBuffer()
+        self.latest = None # Newest Snapshot
+        self.clients = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._new_frame = None
+
+    def start(self):
+        """Starts listening on a background thread; returns once connections are accepted."""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True, name="observation-server")
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def _run(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._new_frame = asyncio.Condition()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._serve_client, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._shutdown())
+            self._loop.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        await self._server.wait_closed()
+        tasks = [task for task in asyncio.all_tasks(self._loop) if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def publish(self, env):
+        """Called by the simulation after each tick. Cost: one frame copy and a buffer swap."""
+        self.buffer.capture(env)
+        self.buffer.swap()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        slot = self.buffer.acquire()
+        if slot is None:
+            return # Already picked up by an earlier wake-up
+        self.latest = Snapshot(slot)
+        asyncio.ensure_future(self._notify())
+
+    async def _notify(self):
+        async with self._new_frame:
+            self._new_frame.notify_all()
+
+    async def _serve_client(self, reader, writer):
+        self.clients += 1
+        base = None # The last Snapshot this client was sent
+        seen = 0 # Newest seq this client has been offered
+        transport = writer.transport
+        try:
+            while True:
+                async with self._new_frame:
+                    await self._new_frame.wait_for(lambda: self.latest is not None and self.latest.seq > seen)
+                frame = self.latest
+                if seen:
+                    self.frames_dropped += frame.seq - seen - 1 # Replaced while we were busy
+                seen = frame.seq
+                if transport.is_closing():
+                    break
+                if transport.get_write_buffer_size() > self.max_buffered:
+                    # Still backed up: skip this one, the next frame will say how many were missed
+                    self.frames_dropped += 1
+                    continue
+                dropped = frame.seq - base.seq - 1 if base is not None else 0
+                writer.write(frame.encode(base, dropped))
+                self.frames_sent += 1
+                base = frame
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    def close(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop = None
+
+
+def decode_frame(header, body, base_food=None):
+    """
+    A frame as a dict. Delta frames need the previous frame's `food_bits`
+    (what decode_frame returned for it); ObservationClient tracks that.
+    """
+    (magic, kind, seq, base_seq, tick, width, height, population, births, deaths, food, food_eaten,
+     n_, e_, s_, w_, stay, dropped, food_len) = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not an Eden observation frame")
+    food_bits = np.frombuffer(zlib.decompress(body[:food_len]), dtype=np.uint8)
+    if kind == DELTA:
+        if base_food is None:
+            raise ValueError(f"Delta frame {seq} needs frame {base_seq} first")
+        food_bits = food_bits ^ base_food
+    offset, n = food_len, population
+    xs = np.frombuffer(body, dtype=np.uint16, count=n, offset=offset)
+    ys = np.frombuffer(body, dtype=np.uint16, count=n, offset=offset + 2 * n)
+    calories = np.frombuffer(body, dtype=np.float32, count=n, offset=offset + 4 * n)
+    return {
+        'seq': seq, 'tick': tick, 'keyframe': kind == KEYFRAME, 'dropped': dropped,
+        'width': width, 'height': height,
+        'food_bits': food_bits,
+        'food': np.unpackbits(food_bits, count=width * height).reshape(height, width).astype(bool),
+        'xs': xs, 'ys': ys, 'calories': calories,
+        'telemetry': {'population': population, 'births': births, 'deaths': deaths, 'food': food,
+                      'food_eaten': food_eaten, 'actions': [n_, e_, s_, w_, stay]},
+    }
+
+
+def body_size(header):
+    """Bytes that follow a frame header: compressed food plus the entity columns."""
+    fields = HEADER.unpack(header)
+    return fields[-1] + 8 * fields[7]
+
+
+class ObservationClient:
+    """Blocking client for scripts and viewers; recv() returns decoded frames in order."""
+    def __init__(self, host="127.0.0.1", port=0, timeout=None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.sock.makefile('rb')
+        self.food_bits = None
+
+    def recv(self):
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ConnectionError("Observation server closed the connection")
+        body = self.file.read(body_size(header))
+        frame = decode_frame(header, body, self.food_bits)
+        self.food_bits = frame['food_bits']
+        return frame
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
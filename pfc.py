@@ -1,4 +1,123 @@
+import math
 import random
+import numpy as np
+
+class WorkingMemory:
+    """
+    The PFC's online buffer, decayed lazily.
+    Items encoded between the same two decay ticks always share one confidence,
+    so they are kept as a cohort. Confidence is replayed from the decay-rate
+    history on read (the same float subtractions, in the same order, as
+    decaying every item every tick), and the oldest cohort is always the
+    least confident, so expiry only ever looks at the front of the
+    time-ordered cohort index: a decay tick costs O(expired items), not O(items).
+    Reads still look like the old dict: memory[key]['confidence'].
+    """
+    def __init__(self):
+        self._items = {} # key -> [data, timestamp, cohort]
+        self._cohorts = {} # cohort (decay count at encode) -> {key: None}, oldest first
+        self._confidence = {} # cohort -> [confidence, decays applied so far]
+        self._rates = [] # decay rates since decay number _rate_base
+        self._rate_base = 0
+        self._decays = 0
+        self._unordered = False # A negative rate breaks oldest-is-least-confident
+
+    def encode(self, key, data, current_tick):
+        if key in self._items:
+            # Refreshing keeps the key's place in iteration order, like overwriting a dict entry
+            self._leave_cohort(key)
+        cohort = self._decays
+        members = self._cohorts.get(cohort)
+        if members is None:
+            members = self._cohorts[cohort] = {}
+            self._confidence[cohort] = [1.0, cohort]
+        members[key] = None
+        self._items[key] = [data, current_tick, cohort]
+
+    def _leave_cohort(self, key):
+        cohort = self._items[key][2]
+        members = self._cohorts[cohort]
+        del members[key]
+        if not members:
+            del self._cohorts[cohort]
+            del self._confidence[cohort]
+
+    def _cohort_confidence(self, cohort):
+        state = self._confidence[cohort]
+        if state[1] < self._decays:
+            confidence = state[0]
+            for rate in self._rates[state[1] - self._rate_base:]:
+                confidence -= rate
+            state[0] = confidence
+            state[1] = self._decays
+        return state[0]
+
+    def decay(self, rate):
+        """Applies one decay tick to every item and drops the ones that reach zero confidence."""
+        self._rates.append(rate)
+        self._decays += 1
+        if rate < 0:
+            self._unordered = True
+        if self._unordered:
+            expired = [cohort for cohort in self._cohorts if self._cohort_confidence(cohort) <= 0]
+        else:
+            expired = []
+            for cohort in self._cohorts:
+                if self._cohort_confidence(cohort) > 0:
+                    break
+                expired.append(cohort)
+        for cohort in expired:
+            for key in self._cohorts.pop(cohort):
+                del self._items[key]
+            del self._confidence[cohort]
+        if not self._cohorts:
+            self.clear()
+            return
+        # Rates older than the oldest live cohort are never replayed again
+        oldest = next(iter(self._cohorts))
+        if oldest - self._rate_base > 1024:
+            del self._rates[:oldest - self._rate_base]
+            self._rate_base = oldest
+
+    def clear(self):
+        self._items.clear()
+        self._cohorts.clear()
+        self._confidence.clear()
+        self._rates.clear()
+        self._rate_base = self._decays
+        self._unordered = False
+
+    def confidence(self, key):
+        return self._cohort_confidence(self._items[key][2])
+
+    def __getitem__(self, key):
+        data, timestamp, cohort = self._items[key]
+        return {'data': data, 'confidence': self._cohort_confidence(cohort), 'timestamp': timestamp}
+
+    def get(self, key, default=None):
+        return self[key] if key in self._items else default
+
+    def __delitem__(self, key):
+        self._leave_cohort(key)
+        del self._items[key]
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def keys(self):
+        return self._items.keys()
+
+    def items(self):
+        return [(key, self[key]) for key in self._items]
+
+    def values(self):
+        return [self[key] for key in self._items]
 
 class SyntheticPFC:
     def __init__(self, max_energy=100.0):
@@ -7,8 +126,8 @@ class SyntheticPFC:
         self.executive_energy = max_energy
         
         # 2. Working Memory
-        # Format: { 'memory_key': {'data': any, 'confidence': 1.0, 'timestamp': int} }
-        self.working_memory = {}
+        # Reads as { 'memory_key': {'data': any, 'confidence': float, 'timestamp': int} }
+        self.working_memory = WorkingMemory()
         
         # 3. Rule Switching & Stagnation
         self.stagnation_counter = 0
@@ -52,11 +171,7 @@ class SyntheticPFC:
         """Add or refresh data in the online buffer."""
         # Only add to memory if we have the energy to do so
         if not self.is_depleted():
-            self.working_memory[key] = {
-                'data': data,
-                'confidence': 1.0,
-                'timestamp': current_tick
-            }
+            self.working_memory.encode(key, data, current_tick)
             self.executive_energy -= 1.0 # Cost of encoding new memory
 
     def process_memory_decay(self, stress_level):
@@ -68,16 +183,26 @@ class SyntheticPFC:
         # Decay modifier increases if stressed or tired
         decay_rate = 0.05 + (stress_level * 0.1) + (fatigue * 0.1)
         
-        keys_to_remove = []
-        for key, mem in self.working_memory.items():
-            mem['confidence'] -= decay_rate
-            self.executive_energy -= self.cost_memory_retain # Holding memory costs energy
+        # Holding memory costs energy, charged for every item held this tick
+        self._charge_retention(len(self.working_memory))
+        self.working_memory.decay(decay_rate)
 
-            if mem['confidence'] <= 0:
-                keys_to_remove.append(key)
-                
-        for key in keys_to_remove:
-            del self.working_memory[key]
+    def _charge_retention(self, items):
+        """
+        Same result as subtracting cost_memory_retain once per item. When the
+        cost is a power of two and the energy stays above it, every one of those
+        subtractions is exact, so a single subtraction of the total is too.
+        """
+        cost = self.cost_memory_retain
+        energy = self.executive_energy
+        if items == 0:
+            return
+        if math.frexp(cost)[0] == 0.5 and energy - cost * items >= 0 and abs(energy) < cost * 2 ** 52:
+            self.executive_energy = energy - cost * items
+            return
+        for _ in range(items):
+            energy -= cost
+        self.executive_energy = energy
 
     def check_rule_switch(self, goal_achieved):
         """Monitors the Reward-to-Effort ratio and switches strategies if stagnant."""
@@ -118,3 +243,204 @@ class SyntheticPFC:
         # If deeply depleted, force a "mental breakdown" state
         if self.is_depleted():
             self.working_memory.clear() # Drop all working memory
+
+
+# Rule codes used by SyntheticPFCBank; the first three are the switchable heuristics
+RULES = ("FORAGE", "HIDE", "EXPLORE", "IMPULSE_DRIVEN", "STAGNANT")
+FORAGE, HIDE, EXPLORE, IMPULSE_DRIVEN, STAGNANT = range(len(RULES))
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+def _splitmix64(x):
+    """SplitMix64 finaliser over a uint64 array (wrapping arithmetic)."""
+    x = x + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+class SyntheticPFCBank:
+    """
+    SyntheticPFC for N entities at once. Every scalar field is an array with
+    one row per entity, rules are integer codes (see RULES), and each method
+    is a handful of masked NumPy operations instead of N method calls.
+
+    Rule switching draws from a counter-based RNG: entity `ids[i]` making its
+    k-th switch always hashes (seed, id, k) to the same choice, whatever else
+    is in the bank and whatever order the rows are in.
+
+    Working memory is `memory_slots` items per entity: integer keys, their
+    data, confidence and encode tick. Decay, retention cost and expiry follow
+    SyntheticPFC exactly; a full row makes room by dropping its least confident item.
+    """
+    def __init__(self, n, max_energy=100.0, seed=0, memory_slots=16, ids=None):
+        self.max_energy = max_energy
+        self.seed = seed
+        self.ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        self.executive_energy = np.full(n, max_energy, dtype=np.float64)
+        self.stagnation_counter = np.zeros(n, dtype=np.int64)
+        self.current_rule = np.full(n, FORAGE, dtype=np.int8)
+        self.switches = np.zeros(n, dtype=np.int64) # Rule switches so far, the RNG counter
+
+        self.memory_keys = np.full((n, memory_slots), -1, dtype=np.int64) # -1 = empty slot
+        self.memory_data = np.empty((n, memory_slots), dtype=object)
+        self.memory_confidence = np.zeros((n, memory_slots), dtype=np.float64)
+        self.memory_timestamp = np.zeros((n, memory_slots), dtype=np.int64)
+
+        # Same costs and threshold as SyntheticPFC
+        self.stagnation_threshold = 50
+        self.cost_inhibit = 5.0
+        self.cost_memory_retain = 0.5
+        self.cost_rule_switch = 15.0
+
+    _rows = ('ids', 'executive_energy', 'stagnation_counter', 'current_rule', 'switches',
+             'memory_keys', 'memory_data', 'memory_confidence', 'memory_timestamp')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, ids):
+        """Appends fresh PFCs for the given entity IDs."""
+        fresh = SyntheticPFCBank(len(ids), self.max_energy, self.seed, self.memory_keys.shape[1], ids)
+        for name in self._rows:
+            setattr(self, name, np.concatenate([getattr(self, name), getattr(fresh, name)]))
+
+    def compact(self, keep):
+        """Drops the rows where `keep` is False, preserving the order of the rest."""
+        for name in self._rows:
+            setattr(self, name, getattr(self, name)[keep])
+
+    def get_fatigue_level(self):
+        return 1.0 - (np.maximum(0, self.executive_energy) / self.max_energy)
+
+    def is_depleted(self):
+        return self.executive_energy <= 0
+
+    def rule_names(self):
+        return [RULES[code] for code in self.current_rule.tolist()]
+
+    def top_down_modulate(self, impulse_strength, active=None):
+        """
+        Vectorized top_down_modulate. Returns a bool array: True where logic
+        overrides the impulse, False where the impulse wins. Rows outside
+        `active` have no impulse this tick and are left alone.
+        """
+        impulse_strength = np.broadcast_to(impulse_strength, self.executive_energy.shape)
+        fresh = ~self.is_depleted()
+        if active is not None:
+            fresh &= active
+        effort = self.cost_inhibit * impulse_strength
+        wins = fresh & (self.executive_energy >= effort)
+        self.executive_energy[wins] -= effort[wins]
+        # Tried and failed: the energy is burned anyway
+        self.executive_energy[fresh & ~wins] = 0
+        return wins
+
+    def update_working_memory(self, rows, keys, current_tick, data=None):
+        """Encodes key `keys[j]` for entity row `rows[j]`; depleted rows ignore it."""
+        rows = np.asarray(rows, dtype=np.int64)
+        keys = np.asarray(keys, dtype=np.int64)
+        if data is None:
+            data = np.empty(len(rows), dtype=object)
+        else:
+            data = np.asarray(data, dtype=object)
+        # A row may appear several times; every round handles one occurrence per row, in call order
+        pending = np.arange(len(rows))
+        while len(pending):
+            _, first = np.unique(rows[pending], return_index=True)
+            batch = pending[np.sort(first)]
+            pending = np.setdiff1d(pending, batch, assume_unique=True)
+            r = rows[batch]
+            live = ~self.is_depleted()[r]
+            batch, r = batch[live], r[live]
+            if len(r) == 0:
+                continue
+            row_keys = self.memory_keys[r]
+            existing = row_keys == keys[batch][:, None]
+            # Refresh the key's slot, else the first empty one, else the least confident
+            held = self.memory_keys[r] >= 0
+            fallback = np.where(held.all(axis=1),
+                                np.argmin(np.where(held, self.memory_confidence[r], np.inf), axis=1),
+                                np.argmax(~held, axis=1))
+            slot = np.where(existing.any(axis=1), np.argmax(existing, axis=1), fallback)
+            self.memory_keys[r, slot] = keys[batch]
+            self.memory_data[r, slot] = data[batch]
+            self.memory_confidence[r, slot] = 1.0
+            self.memory_timestamp[r, slot] = current_tick
+            self.executive_energy[r] -= 1.0 # Cost of encoding new memory
+
+    def memory_size(self):
+        return np.count_nonzero(self.memory_keys >= 0, axis=1)
+
+    def process_memory_decay(self, stress_level):
+        decay_rate = 0.05 + (np.asarray(stress_level) * 0.1) + (self.get_fatigue_level() * 0.1)
+        held = self.memory_keys >= 0
+        self._charge_retention(np.count_nonzero(held, axis=1))
+        self.memory_confidence -= np.where(held, decay_rate[:, None], 0.0)
+        expired = held & (self.memory_confidence <= 0)
+        self.memory_keys[expired] = -1
+        self.memory_data[expired] = None
+
+    def _charge_retention(self, items):
+        """Per-row SyntheticPFC._charge_retention: one subtraction where that is exact, else one per item."""
+        cost = self.cost_memory_retain
+        energy = self.executive_energy
+        total = cost * items
+        if math.frexp(cost)[0] == 0.5:
+            exact = (energy - total >= 0) & (np.abs(energy) < cost * 2 ** 52)
+        else:
+            exact = items == 0
+        energy[exact] -= total[exact]
+        slow = np.nonzero(~exact)[0]
+        for step in range(int(items[slow].max()) if len(slow) else 0):
+            rows = slow[items[slow] > step]
+            energy[rows] -= cost
+
+    def _draw_rules(self, rows):
+        """A new heuristic for each row, never its current one when that is a heuristic."""
+        seed = _splitmix64(np.full(1, self.seed, dtype=np.uint64))
+        stream = _splitmix64(self.ids[rows].astype(np.uint64) ^ seed)
+        bits = _splitmix64(stream ^ self.switches[rows].astype(np.uint64))
+        current = self.current_rule[rows]
+        heuristic = current <= EXPLORE
+        choices = np.where(heuristic, 2, 3).astype(np.uint64)
+        pick = (bits % choices).astype(np.int8)
+        # Skip over the current rule, like removing it from the choice list
+        pick += heuristic & (pick >= current)
+        self.switches[rows] += 1
+        return pick
+
+    def check_rule_switch(self, goal_achieved):
+        depleted = self.is_depleted()
+        self.current_rule[depleted] = IMPULSE_DRIVEN
+
+        thinking = ~depleted
+        goal_achieved = np.broadcast_to(goal_achieved, depleted.shape)
+        self.stagnation_counter[thinking & goal_achieved] = 0
+        self.stagnation_counter[thinking & ~goal_achieved] += 1
+
+        stagnant = thinking & (self.stagnation_counter >= self.stagnation_threshold)
+        can_afford = self.executive_energy >= self.cost_rule_switch
+        # Too tired to think of a new plan. Stuck in a rut.
+        self.current_rule[stagnant & ~can_afford] = STAGNANT
+        switching = np.nonzero(stagnant & can_afford)[0]
+        if len(switching):
+            # Spend massive energy to break out of a loop and try a new heuristic
+            self.executive_energy[switching] -= self.cost_rule_switch
+            self.stagnation_counter[switching] = 0
+            self.current_rule[switching] = self._draw_rules(switching)
+        return self.current_rule
+
+    def rest(self, recovery_amount, rows=None):
+        if rows is None:
+            self.executive_energy = np.minimum(self.max_energy, self.executive_energy + recovery_amount)
+        else:
+            self.executive_energy[rows] = np.minimum(self.max_energy, self.executive_energy[rows] + recovery_amount)
+
+    def tick(self, current_tick, stress_level, goal_achieved):
+        self.process_memory_decay(stress_level)
+        self.check_rule_switch(goal_achieved)
+
+        # If deeply depleted, force a "mental breakdown" state
+        depleted = self.is_depleted()
+        self.memory_keys[depleted] = -1
+        self.memory_data[depleted] = None
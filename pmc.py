@@ -1,5 +1,7 @@
+import heapq
 import random
 import math
+import numpy as np
 
 class SyntheticM1:
     def __init__(self):
@@ -13,8 +15,10 @@ class SyntheticM1:
         }
         
         # 2. Action Queue (The Latency Gap)
-        # Stores commands as: {'vector': (dx, dy), 'part': string, 'force': float, 'execute_tick': int}
+        # A min-heap of compact records: (execute_tick, seq, dx, dy, force, part).
+        # seq is the arrival order, so ripe commands can be combined in the order they were sent.
         self.spinal_cord_queue = []
+        self._next_seq = 0
         self.base_latency_ticks = 2 # Minimum ticks between request and execution
         
         # 3. Proprioception Feedback
@@ -56,15 +60,42 @@ class SyntheticM1:
         # High stress can slightly reduce latency (panic reflex) but costs accuracy.
         actual_latency = max(1, self.base_latency_ticks - int(limbic_stress * 2))
         
-        command = {
-            'vector': (step_dx, step_dy),
-            'part': body_part,
-            'force': force_multiplier,
-            'execute_tick': current_tick + actual_latency
-        }
-        
-        self.spinal_cord_queue.append(command)
-        
+        command = (current_tick + actual_latency, self._next_seq, step_dx, step_dy, force_multiplier, body_part)
+        self._next_seq += 1
+        heapq.heappush(self.spinal_cord_queue, command)
+
+    def receive_commands(self, current_ticks, body_parts, target_vectors, force_multipliers, limbic_stress):
+        """
+        receive_command for a whole sequence sharing one stress level (a PMC macro),
+        enqueued in one go. Same tremor draws, in the same order, as calling
+        receive_command once per step.
+        """
+        actual_latency = max(1, self.base_latency_ticks - int(limbic_stress * 2))
+        homunculus, shake = self.homunculus, limbic_stress * 1.5
+        uniform, atan2, cos, sin, sqrt = random.uniform, math.atan2, math.cos, math.sin, math.sqrt
+        queue = self.spinal_cord_queue
+        seq = self._next_seq
+        for tick, body_part, target_vector, force in zip(current_ticks, body_parts, target_vectors, force_multipliers):
+            # receive_command's tremor, rate coding and rounding, inlined with the lookups hoisted
+            dx, dy = target_vector
+            tremor_magnitude = shake * (1.0 - homunculus.get(body_part, 0.5))
+            if tremor_magnitude > 0:
+                spread = tremor_magnitude * (math.pi/4)
+                new_angle = atan2(dy, dx) + uniform(-spread, spread)
+                length = sqrt(dx**2 + dy**2)
+                if length != 0:
+                    dx, dy = cos(new_angle) * length, sin(new_angle) * length
+            final_dx = dx * force
+            final_dy = dy * force
+            step_dx = round(final_dx)
+            step_dy = round(final_dy)
+            if step_dx == 0 and step_dy == 0 and force > 0:
+                step_dx = 1 if final_dx > 0 else (-1 if final_dx < 0 else 0)
+                step_dy = 1 if final_dy > 0 else (-1 if final_dy < 0 else 0)
+            heapq.heappush(queue, (tick + actual_latency, seq, step_dx, step_dy, force, body_part))
+            seq += 1
+        self._next_seq = seq
+
     def _apply_rotational_noise(self, vector, magnitude):
         """Rotates the vector by a random angle based on tremor magnitude."""
         if magnitude <= 0: return vector
@@ -105,23 +136,27 @@ class SyntheticM1:
                 self.tripped = True
                 self.trip_recovery_ticks = 2 # Lose 2 ticks of movement
                 self.last_expected_position = actual_position
-                self.spinal_cord_queue.clear() # Drop any pending commands (flailing)
+                self.spinal_cord_queue = [] # Drop any pending commands (flailing)
                 return (0, 0), 0.0
 
         # Execute ripe commands
         execution_vector = (0, 0)
         total_force_used = 0.0
         
-        commands_to_keep = []
-        for cmd in self.spinal_cord_queue:
-            if current_tick >= cmd['execute_tick']:
+        queue = self.spinal_cord_queue
+        if queue and queue[0][0] <= current_tick:
+            # Only the ripe commands are touched; pop them all, then combine in arrival order
+            ripe = []
+            while queue and queue[0][0] <= current_tick:
+                ripe.append(heapq.heappop(queue))
+            ripe.sort(key=lambda cmd: cmd[1])
+            dx = dy = 0
+            for _, _, step_dx, step_dy, force, _ in ripe:
                 # Combine vectors if multiple commands fire at once
-                execution_vector = (execution_vector[0] + cmd['vector'][0], execution_vector[1] + cmd['vector'][1])
-                total_force_used += cmd['force']
-            else:
-                commands_to_keep.append(cmd)
-                
-        self.spinal_cord_queue = commands_to_keep
+                dx += step_dx
+                dy += step_dy
+                total_force_used += force
+            execution_vector = (dx, dy)
         
         # Set expectation for next tick's proprioceptive check
         if execution_vector != (0, 0):
@@ -132,3 +167,151 @@ class SyntheticM1:
             self.last_expected_position = actual_position
 
         return execution_vector, total_force_used
+
+
+# Body-part codes for SyntheticM1Bank; anything else uses OTHER (precision 0.5, like homunculus.get's default)
+BODY_PARTS = ("FACE", "HANDS", "LEGS", "TORSO", "OTHER")
+PART_CODES = {name: code for code, name in enumerate(BODY_PARTS)}
+PRECISION = np.array([0.9, 0.8, 0.3, 0.1, 0.5])
+
+def part_codes(names):
+    return np.array([PART_CODES.get(name, PART_CODES["OTHER"]) for name in names], dtype=np.int8)
+
+class SyntheticM1Bank:
+    """
+    SyntheticM1 for a whole population. Commands arrive as batches of arrays
+    (entity row, body-part code, vector, force, stress); tremor, rate coding,
+    grid rounding and latency are computed for the batch at once. Pending
+    commands wait in one shared timing wheel keyed by execute tick, so a tick
+    only touches the commands that ripen on it.
+
+    Commands remember the entity's stable ID, not its row, so compact() and
+    add() never have to rewrite the queue. A trip flushes an entity's commands
+    in O(1) by bumping its epoch; stale commands are dropped when they come due.
+    Ripe commands are summed per entity in arrival order, as SyntheticM1 does.
+    Tremor angles come from np.random instead of the random module.
+    """
+    def __init__(self, n, ids=None):
+        self.ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        self.base_latency_ticks = 2
+        self.tripped = np.zeros(n, dtype=bool)
+        self.trip_recovery_ticks = np.zeros(n, dtype=np.int64)
+        self.has_expected = np.zeros(n, dtype=bool)
+        self.last_expected_position = np.zeros((n, 2), dtype=np.int64)
+        self.epoch = np.zeros(n, dtype=np.int64)
+
+        self._wheel = {} # execute tick -> list of command chunks
+        self._due_ticks = [] # min-heap of the wheel's keys
+        self._carried = None # Ripe commands of entities still recovering from a trip
+        self._next_seq = 0
+
+    _rows = ('ids', 'tripped', 'trip_recovery_ticks', 'has_expected', 'last_expected_position', 'epoch')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, ids):
+        """Appends fresh M1s for new entity IDs (larger than every existing one)."""
+        fresh = SyntheticM1Bank(len(ids), ids)
+        for name in self._rows:
+            setattr(self, name, np.concatenate([getattr(self, name), getattr(fresh, name)]))
+
+    def compact(self, keep):
+        """Drops rows where `keep` is False; their queued commands expire unexecuted."""
+        for name in self._rows:
+            setattr(self, name, getattr(self, name)[keep])
+
+    def receive_batch(self, current_tick, rows, parts, vectors, forces, stress):
+        """Vectorized receive_command for many commands (rows may repeat)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float64).reshape(-1, 2)
+        forces = np.broadcast_to(np.asarray(forces, dtype=np.float64), rows.shape)
+        stress = np.broadcast_to(np.asarray(stress, dtype=np.float64), rows.shape)
+
+        # The Tremor: rotate by a random angle, keeping the length
+        tremor = (stress * 1.5) * (1.0 - PRECISION[np.asarray(parts)])
+        dx, dy = vectors[:, 0].copy(), vectors[:, 1].copy()
+        shaky = np.nonzero(tremor > 0)[0]
+        if len(shaky):
+            spread = tremor[shaky] * (math.pi / 4)
+            new_angle = np.arctan2(dy[shaky], dx[shaky]) + np.random.uniform(-spread, spread)
+            length = np.sqrt(dx[shaky] ** 2 + dy[shaky] ** 2)
+            moving = length != 0
+            shaky, new_angle, length = shaky[moving], new_angle[moving], length[moving]
+            dx[shaky] = np.cos(new_angle) * length
+            dy[shaky] = np.sin(new_angle) * length
+
+        # Rate coding, then grid rounding (np.rint rounds half to even like round())
+        final_dx, final_dy = dx * forces, dy * forces
+        step_dx, step_dy = np.rint(final_dx), np.rint(final_dy)
+        nudge = (step_dx == 0) & (step_dy == 0) & (forces > 0)
+        step_dx[nudge] = np.sign(final_dx[nudge])
+        step_dy[nudge] = np.sign(final_dy[nudge])
+
+        latency = np.maximum(1, self.base_latency_ticks - (stress * 2).astype(np.int64))
+        execute = current_tick + latency
+        seq = self._next_seq + np.arange(len(rows))
+        self._next_seq += len(rows)
+        chunk = (self.ids[rows], self.epoch[rows], seq,
+                 step_dx.astype(np.int64), step_dy.astype(np.int64), forces.copy())
+        for tick in np.unique(execute).tolist():
+            at = execute == tick
+            if tick not in self._wheel:
+                self._wheel[tick] = []
+                heapq.heappush(self._due_ticks, tick)
+            self._wheel[tick].append(tuple(column[at] for column in chunk))
+
+    def execute_tick(self, current_tick, actual_positions, world_size=None):
+        """
+        Vectorized execute_tick for every entity. actual_positions is (N, 2).
+        world_size: (width, height) of a wrapping world, so the position expected
+        next tick wraps the way the world will move the body.
+        Returns ((N, 2) int execution vectors, (N,) force totals).
+        """
+        n = len(self.ids)
+        actual_positions = np.asarray(actual_positions, dtype=np.int64)
+        vectors = np.zeros((n, 2), dtype=np.int64)
+        forces = np.zeros(n, dtype=np.float64)
+
+        # Recovering from a trip: no movement, ripe commands wait
+        recovering = self.tripped.copy()
+        self.trip_recovery_ticks[recovering] -= 1
+        self.tripped[recovering & (self.trip_recovery_ticks <= 0)] = False
+
+        # Proprioceptive check: we are not where we expected to be, so trip and flail
+        mismatch = ~recovering & self.has_expected & (self.last_expected_position != actual_positions).any(axis=1)
+        self.tripped[mismatch] = True
+        self.trip_recovery_ticks[mismatch] = 2
+        self.last_expected_position[mismatch] = actual_positions[mismatch]
+        self.epoch[mismatch] += 1 # Drops every pending command of these entities
+
+        # Gather everything due by now
+        chunks = [] if self._carried is None else [self._carried]
+        while self._due_ticks and self._due_ticks[0] <= current_tick:
+            chunks.extend(self._wheel.pop(heapq.heappop(self._due_ticks)))
+        self._carried = None
+        if chunks:
+            ids, epochs, seq, cmd_dx, cmd_dy, cmd_force = (np.concatenate(column) for column in zip(*chunks))
+            rows = np.minimum(np.searchsorted(self.ids, ids), max(n - 1, 0))
+            live = (self.ids[rows] == ids) & (self.epoch[rows] == epochs) if n else np.zeros(len(ids), dtype=bool)
+            waiting = live & recovering[rows]
+            if waiting.any():
+                self._carried = tuple(column[waiting] for column in (ids, epochs, seq, cmd_dx, cmd_dy, cmd_force))
+            fire = np.nonzero(live & ~recovering[rows])[0]
+            # Arrival order, so each entity's forces add up exactly as in SyntheticM1
+            fire = fire[np.argsort(seq[fire], kind='stable')]
+            r = rows[fire]
+            vectors[:, 0] = np.bincount(r, weights=cmd_dx[fire], minlength=n).astype(np.int64)
+            vectors[:, 1] = np.bincount(r, weights=cmd_dy[fire], minlength=n).astype(np.int64)
+            forces[:] = np.bincount(r, weights=cmd_force[fire], minlength=n)
+
+        # Expect to land on position + delta next tick
+        acting = ~recovering & ~mismatch
+        expected = actual_positions[acting] + vectors[acting]
+        if world_size is not None:
+            expected %= world_size
+        self.last_expected_position[acting] = expected
+        self.has_expected[acting] = True
+        return vectors, forces
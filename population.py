@@ -0,0 +1,306 @@
+import numpy as np
+from entity import LiminalEntity
+from evolution import BitNetGenome, batched_forward, mutate_stacked
+
+# Action encoding shared with LiminalEntity.act: N, E, S, W, Stay
+ACTIONS = ['N', 'E', 'S', 'W', 'Stay']
+ACTION_DX = np.array([0, 1, 0, -1, 0], dtype=np.int64)
+ACTION_DY = np.array([-1, 0, 1, 0, 0], dtype=np.int64)
+STAY = 4
+
+# Food value matches LiminalEntity.act; both engines reproduce with these
+FOOD_VALUE = 100
+REPRODUCE_THRESHOLD = 200
+REPRODUCE_COST = 100
+BIRTH_CALORIES = 200
+
+
+def sample_actions(logits):
+    """
+    Vectorized version of the per-entity softmax + np.random.choice.
+    logits is (N, 5) float32; returns an (N,) array of action indices.
+    """
+    e_x = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+    probs = e_x / e_x.sum(axis=1, keepdims=True)
+
+    # Inverse-CDF sampling, same construction np.random.choice uses internally
+    cdf = np.cumsum(probs.astype(np.float64), axis=1)
+    cdf /= cdf[:, -1:]
+    u = np.random.random(len(logits))
+    return np.minimum((cdf <= u[:, None]).sum(axis=1), len(ACTIONS) - 1)
+
+
+class EntityView(LiminalEntity):
+    """
+    A thin LiminalEntity whose state lives in a Population's arrays.
+    Reads and writes go straight to the backing slot, so existing callers
+    (visualize.py, entity.act) keep working against the vectorized engine.
+    """
+    def __init__(self, population, entity_id, slot):
+        # Deliberately skips LiminalEntity.__init__: no per-entity state is owned here
+        self._population = population
+        self.id = entity_id
+        self._slot = slot
+        self._generation = population.generation
+
+    @property
+    def _index(self):
+        pop = self._population
+        if self._generation != pop.generation:
+            # Slots were compacted since we last looked; IDs stay sorted so re-resolve by bisection
+            slot = int(np.searchsorted(pop.ids[:pop.size], self.id))
+            if slot >= pop.size or pop.ids[slot] != self.id:
+                raise LookupError(f"Entity {self.id} is no longer alive")
+            self._slot = slot
+            self._generation = pop.generation
+        return self._slot
+
+    def _field(name):
+        def getter(self):
+            return getattr(self._population, name)[self._index].item()
+
+        def setter(self, value):
+            getattr(self._population, name)[self._index] = value
+
+        return property(getter, setter)
+
+    x = _field('x')
+    y = _field('y')
+    calories = _field('calories')
+    metabolism = _field('metabolism')
+    movement_cost = _field('movement_cost')
+    del _field
+
+    @property
+    def genome(self):
+        # A genome wrapping views into the stacked weight tensors (no copy)
+        pop = self._population
+        slot = self._index
+        return BitNetGenome.from_weights(pop.layer_sizes, [w[slot] for w in pop.weights])
+
+    @genome.setter
+    def genome(self, value):
+        pop = self._population
+        slot = self._index
+        for w, layer in zip(pop.weights, value.layers):
+            w[slot] = layer.weights
+
+    def __repr__(self):
+        return f"EntityView(id={self.id})"
+
+
+class EntityList:
+    """Read-only sequence of EntityViews over the live slots of a Population."""
+    def __init__(self, population):
+        self._population = population
+
+    def __len__(self):
+        return self._population.size
+
+    def __getitem__(self, slot):
+        pop = self._population
+        if slot < 0:
+            slot += pop.size
+        if not 0 <= slot < pop.size:
+            raise IndexError("entity index out of range")
+        return EntityView(pop, int(pop.ids[slot]), slot)
+
+    def __iter__(self):
+        pop = self._population
+        for slot, entity_id in enumerate(pop.ids[:pop.size].tolist()):
+            yield EntityView(pop, entity_id, slot)
+
+
+class Population:
+    """
+    Struct-of-arrays storage for the vectorized engine.
+    Every per-entity scalar lives in one contiguous array; slots [0, size) are live.
+    IDs are handed out in increasing order and compaction preserves order, so
+    ids[:size] is always sorted.
+    Genomes are held as one stacked (capacity, in, out) int8 tensor per BitNet layer.
+    """
+    def __init__(self, capacity=64, layer_sizes=(10, 16, 5), mutation_rates=None):
+        self.layer_sizes = list(layer_sizes)
+        self.mutation_rates = mutation_rates # None: evolution.MUTATION_RATE for every layer
+        self.size = 0
+        self.capacity = 0
+        self.next_id = 0
+        # Bumped whenever live slots are reordered, so EntityViews know to re-resolve
+        self.generation = 0
+        # When set, spawn_children keeps (parent IDs, per-layer (sites, values)) in last_births
+        self.record_births = False
+        self.last_births = None
+
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.x = np.zeros(0, dtype=np.int64)
+        self.y = np.zeros(0, dtype=np.int64)
+        self.calories = np.zeros(0, dtype=np.float64)
+        self.metabolism = np.zeros(0, dtype=np.float64)
+        self.movement_cost = np.zeros(0, dtype=np.float64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.weights = [
+            np.zeros((0, n_in, n_out), dtype=np.int8)
+            for n_in, n_out in zip(self.layer_sizes[:-1], self.layer_sizes[1:])
+        ]
+        self._reserve(capacity)
+
+    _fields = ('ids', 'x', 'y', 'calories', 'metabolism', 'movement_cost', 'alive')
+
+    def _arrays(self):
+        return [getattr(self, name) for name in self._fields] + self.weights
+
+    def _set_arrays(self, arrays):
+        for name, arr in zip(self._fields, arrays):
+            setattr(self, name, arr)
+        self.weights = arrays[len(self._fields):]
+
+    def _reserve(self, needed):
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, 2 * self.capacity, 16)
+        grown = []
+        for old in self._arrays():
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            grown.append(new)
+        self._set_arrays(grown)
+        self.capacity = capacity
+
+    def add(self, entity, x, y):
+        """Copies a LiminalEntity's state into a fresh slot and returns its ID."""
+        genes = [layer.weights[None] for layer in entity.genome.layers]
+        return self.extend(
+            np.array([x]), np.array([y]), np.array([entity.calories], dtype=np.float64),
+            genes, metabolism=entity.metabolism, movement_cost=entity.movement_cost
+        )[0]
+
+    def extend(self, xs, ys, calories, weights, metabolism=1, movement_cost=2):
+        """
+        Appends a batch of entities and returns their new IDs.
+        weights holds one (n, in, out) ternary block per layer.
+        """
+        n = len(xs)
+        start, end = self.size, self.size + n
+        self._reserve(end)
+
+        new_ids = np.arange(self.next_id, self.next_id + n, dtype=np.int64)
+        self.next_id += n
+        self.ids[start:end] = new_ids
+        self.x[start:end] = xs
+        self.y[start:end] = ys
+        self.calories[start:end] = calories
+        self.metabolism[start:end] = metabolism
+        self.movement_cost[start:end] = movement_cost
+        self.alive[start:end] = True
+        for stack, block in zip(self.weights, weights):
+            stack[start:end] = block
+        self.size = end
+        return new_ids
+
+    def compact(self):
+        """Drops every slot whose alive flag is cleared, preserving order."""
+        n = self.size
+        keep = self.alive[:n].copy()
+        kept = int(np.count_nonzero(keep))
+        if kept == n:
+            return 0
+        for arr in self._arrays():
+            arr[:kept] = arr[:n][keep]
+        self.size = kept
+        self.generation += 1
+        return n - kept
+
+    def views(self):
+        return EntityList(self)
+
+    def take(self, slots):
+        """Copies the given slots out as a plain dict of arrays (for handing entities elsewhere)."""
+        batch = {name: getattr(self, name)[slots].copy() for name in self._fields if name not in ('ids', 'alive')}
+        batch['weights'] = [w[slots].copy() for w in self.weights]
+        return batch
+
+    def extend_from(self, batch):
+        """Appends entities produced by take(); they receive fresh IDs."""
+        return self.extend(
+            batch['x'], batch['y'], batch['calories'], batch['weights'],
+            metabolism=batch['metabolism'], movement_cost=batch['movement_cost']
+        )
+
+    # --- Tick phases. EdenOfShadows and the sharded world both run a tick as:
+    # metabolize -> decide -> move -> eat -> cull -> reproduce
+
+    def metabolize(self):
+        n = self.size
+        self.calories[:n] -= self.metabolism[:n]
+
+    def states(self, vision):
+        """Network inputs: (N, 9) vision rows plus the hunger scalar, as in LiminalEntity.act."""
+        return np.column_stack([vision, self.calories[:self.size] / 200.0])
+
+    def decide(self, vision):
+        """Samples one action per live entity from its vision rows and hunger."""
+        return sample_actions(self.forward(self.states(vision)))
+
+    def move(self, actions, width, height):
+        n = self.size
+        moving = actions != STAY
+        self.calories[:n][moving] -= self.movement_cost[:n][moving]
+        self.x[:n] = (self.x[:n] + ACTION_DX[actions]) % width
+        self.y[:n] = (self.y[:n] + ACTION_DY[actions]) % height
+
+    def eat(self, food_cells, row_offset=0):
+        """
+        Food collision against a bitmap whose row 0 is grid row `row_offset`.
+        One eater per food cell, lowest slot (oldest entity) wins.
+        Returns the eaters' slots; the caller clears the food cells.
+        """
+        n = self.size
+        x, y = self.x[:n], self.y[:n] - row_offset
+        hit = np.nonzero(food_cells[y, x])[0]
+        if len(hit) == 0:
+            return hit
+        cells = y[hit] * food_cells.shape[1] + x[hit]
+        _, first = np.unique(cells, return_index=True)
+        eaters = hit[first]
+        self.calories[eaters] += FOOD_VALUE
+        return eaters
+
+    def cull(self):
+        """Starved entities die; returns how many."""
+        n = self.size
+        self.alive[:n] = self.calories[:n] > 0
+        return self.compact()
+
+    def reproduce(self):
+        """Every entity over the threshold splits; returns the children's IDs."""
+        parents = np.nonzero(self.calories[:self.size] > REPRODUCE_THRESHOLD)[0]
+        return self.spawn_children(parents)
+
+    def forward(self, states):
+        """Brainstem logits for every live entity, (N, 10) states -> (N, 5) logits."""
+        n = self.size
+        return batched_forward([w[:n] for w in self.weights], states)
+
+    def spawn_children(self, parent_slots, mutations=None):
+        """
+        Asexual splitting for a batch of parents; children appear on the parent's cell.
+        mutations: per-layer (flat sites, values) to write into the stacked offspring
+        instead of sampling new ones, as a replay log recorded them.
+        """
+        if len(parent_slots) == 0:
+            return np.zeros(0, dtype=np.int64)
+        self.calories[parent_slots] -= REPRODUCE_COST
+        # Inherit by gathering the parents' stacked matrices, then mutate all offspring at once
+        offspring = [w[parent_slots] for w in self.weights]
+        if mutations is None:
+            touched = mutate_stacked(offspring, self.mutation_rates)
+            if self.record_births:
+                mutations = [(sites, w.reshape(-1)[sites]) for w, sites in zip(offspring, touched)]
+                self.last_births = (self.ids[parent_slots], mutations)
+        else:
+            for w, (sites, values) in zip(offspring, mutations):
+                w.reshape(-1)[sites] = values
+        return self.extend(
+            self.x[parent_slots], self.y[parent_slots],
+            np.full(len(parent_slots), BIRTH_CALORIES, dtype=np.float64), offspring
+        )
@@ -1,4 +1,40 @@
 import random
+import numpy as np
+from pmc import part_codes
+
+# Under extreme fear every macro except these collapses into FREEZE
+SURVIVAL_REFLEXES = ("FREEZE", "FLEE_SPRINT")
+
+# Macro codes for SyntheticPMCBank and EdenOfShadows.macro_histogram, in the default library's order
+MACROS = ("FREEZE", "FLEE_SPRINT", "COMPLEX_EVADE", "PRECISE_GRASP")
+MACRO_CODES = {name: code for code, name in enumerate(MACROS)}
+NO_MACRO = -1
+
+def macro_codes(names):
+    """Macro names (or None) to codes; anything outside MACROS is NO_MACRO."""
+    return np.array([MACRO_CODES.get(name, NO_MACRO) for name in names], dtype=np.int64)
+
+class MacroPlan:
+    """
+    The deterministic part of a macro's expansion, compiled once: step offsets,
+    body parts, vectors and forces with clumsiness already applied, plus the
+    same columns as arrays (part codes included) for SyntheticM1Bank.
+    `deferred` lists the steps with a positive offset, the only ones that can flinch.
+    """
+    def __init__(self, sequence, clumsiness_modifier):
+        self.offsets = [step[0] for step in sequence]
+        self.parts = [step[1] for step in sequence]
+        self.vectors = [step[2] for step in sequence]
+        self.forces = [step[3] * clumsiness_modifier for step in sequence]
+        self.deferred = [i for i, offset in enumerate(self.offsets) if offset > 0]
+
+        self.offset_array = np.array(self.offsets, dtype=np.int64)
+        self.part_codes = part_codes(self.parts)
+        self.vector_array = np.array(self.vectors, dtype=np.float64).reshape(-1, 2)
+        self.force_array = np.array(self.forces, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.offsets)
 
 class SyntheticPMC:
     def __init__(self):
@@ -15,50 +51,79 @@ class SyntheticPMC:
         self.mirror_prepared_macro = None
         self.empathy_threshold = 2 # How many peers need to do an action before we mirror it
 
-    def prepare_macro(self, macro_name, pfc_cognitive_load, limbic_stress, current_tick, m1_module):
+        # 3. Compiled macro plans, each kept with the library steps it was compiled from
+        self._plans = {} # (macro, clumsy, panicking) -> (steps, MacroPlan or None)
+
+    def define_macro(self, macro_name, sequence):
+        """Adds or replaces a macro in action_library."""
+        self.action_library[macro_name] = list(sequence)
+
+    def compile_plan(self, macro_name, clumsy, panicking):
         """
-        Translates a Macro request into individual M1 commands, applying Anticipatory Errors
-        like Flinching, Clumsiness, and Stereotypy.
+        The cached MacroPlan a request resolves to, or None for an unknown macro.
+        A plan is only reused while its macro's steps in action_library still
+        compare equal, so direct edits to the library recompile it too.
         """
-        
+        key = (macro_name, clumsy, panicking)
+
         # Feature: Heuristic Stereotypy
         # Under extreme fear, complex routines are lost. Revert to hardwired survival reflex.
-        if limbic_stress >= 0.9 and macro_name not in ["FREEZE", "FLEE_SPRINT"]:
+        if panicking and macro_name not in SURVIVAL_REFLEXES:
             # Override PFC's complex request with a dumb panic reflex
             macro_name = "FREEZE"
-            
-        macro_sequence = self.action_library.get(macro_name, [])
-        if not macro_sequence:
-            return # Unknown macro
-            
+
+        macro_sequence = tuple(self.action_library.get(macro_name, ()))
+        cached = self._plans.get(key)
+        if cached is not None and cached[0] == macro_sequence:
+            return cached[1]
+
         # Feature: Motor Clumsiness (Cognitive Load interference)
         # If the PFC is thinking too hard, the PMC loses precision.
-        clumsiness_modifier = 1.0
-        if pfc_cognitive_load > 0.8:
-            clumsiness_modifier = 0.5 # Force multiplier drops, making actions weak/clumsy
-            
-        for step in macro_sequence:
-            tick_offset, body_part, target_vector, force = step
-            
-            applied_force = force * clumsiness_modifier
-            
-            # Feature: Anticipatory Error (The Flinch)
-            # High stress causes the PMC to send the signal to the M1 too early.
-            actual_tick_to_fire = current_tick + tick_offset
-            if limbic_stress > 0.7 and tick_offset > 0:
-                if random.random() < (limbic_stress * 0.5):
+        # Force multiplier drops to half, making actions weak/clumsy
+        plan = MacroPlan(macro_sequence, 0.5 if clumsy else 1.0) if macro_sequence else None
+        self._plans[key] = (macro_sequence, plan)
+        return plan
+
+    def prepare_macro(self, macro_name, pfc_cognitive_load, limbic_stress, current_tick, m1_module, row=None):
+        """
+        Translates a Macro request into individual M1 commands, applying Anticipatory Errors
+        like Flinching, Clumsiness, and Stereotypy.
+        Stereotypy and clumsiness come precompiled from compile_plan(); only the flinch is
+        rolled per call. The steps reach the M1 as one batch: receive_commands on a
+        SyntheticM1, receive_batch for entity `row` of a SyntheticM1Bank, else one
+        receive_command per step.
+        """
+        plan = self.compile_plan(macro_name, pfc_cognitive_load > 0.8, limbic_stress >= 0.9)
+        if plan is None:
+            return # Unknown macro
+
+        fire_ticks = [current_tick + offset for offset in plan.offsets]
+
+        # Feature: Anticipatory Error (The Flinch)
+        # High stress causes the PMC to send the signal to the M1 too early.
+        if limbic_stress > 0.7:
+            flinch_chance = limbic_stress * 0.5
+            for i in plan.deferred:
+                if random.random() < flinch_chance:
                     # Flinch! Fire it immediately instead of waiting for the offset
-                    actual_tick_to_fire = current_tick
-                    
-            # Dispatch to Primary Motor Cortex (M1)
-            # We pass the instruction to the M1, which handles its own latency and tremor
-            m1_module.receive_command(
-                current_tick=actual_tick_to_fire, 
-                body_part=body_part, 
-                target_vector=target_vector, 
-                force_multiplier=applied_force, 
-                limbic_stress=limbic_stress
-            )
+                    fire_ticks[i] = current_tick
+
+        # Dispatch to Primary Motor Cortex (M1)
+        # We pass the instruction to the M1, which handles its own latency and tremor
+        if row is not None:
+            m1_module.receive_batch(np.array(fire_ticks), np.full(len(plan), row), plan.part_codes,
+                                    plan.vector_array, plan.force_array, limbic_stress)
+        elif hasattr(m1_module, 'receive_commands'):
+            m1_module.receive_commands(fire_ticks, plan.parts, plan.vectors, plan.forces, limbic_stress)
+        else:
+            for tick, body_part, target_vector, force in zip(fire_ticks, plan.parts, plan.vectors, plan.forces):
+                m1_module.receive_command(
+                    current_tick=tick,
+                    body_part=body_part,
+                    target_vector=target_vector,
+                    force_multiplier=force,
+                    limbic_stress=limbic_stress
+                )
             
     def process_mirror_neurons(self, observed_peer_actions):
         """
@@ -83,3 +148,101 @@ class SyntheticPMC:
                 
         self.mirror_prepared_macro = None
         return None
+
+
+class SyntheticPMCBank:
+    """
+    SyntheticPMC state for a whole population, one row per entity.
+    Macros are integer codes into self.macros (MACROS first, then anything added
+    with define_macro) and expand through one shared SyntheticPMC's cached plans.
+    Mirror neurons read a per-cell macro histogram (EdenOfShadows.macro_histogram)
+    instead of a list of peer actions, so each entity's decision is one lookup.
+    """
+    def __init__(self, n, ids=None, library=None):
+        self.ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        self.mirror_prepared_macro = np.full(n, NO_MACRO, dtype=np.int64)
+        self.empathy_threshold = 2 # How many peers need to do an action before we mirror it
+        self.library = library or SyntheticPMC()
+        self.macros = list(MACROS)
+
+    def define_macro(self, macro_name, sequence):
+        """Adds or replaces a macro in the shared library; returns its code."""
+        self.library.define_macro(macro_name, sequence)
+        if macro_name not in self.macros:
+            self.macros.append(macro_name)
+        return self.macros.index(macro_name)
+
+    def prepare_macros(self, current_tick, rows, macros, pfc_cognitive_load, limbic_stress, m1_bank):
+        """
+        Batched prepare_macro: entity rows[j] runs macro code macros[j]. Entities
+        sharing a (macro, clumsy, panicking) plan are expanded together, flinches
+        are rolled with np.random, and every step of every macro reaches the
+        SyntheticM1Bank in a single receive_batch. Returns how many commands were sent.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        macros = np.asarray(macros, dtype=np.int64)
+        load = np.broadcast_to(np.asarray(pfc_cognitive_load, dtype=np.float64), rows.shape)
+        stress = np.broadcast_to(np.asarray(limbic_stress, dtype=np.float64), rows.shape)
+        keys = macros * 4 + (load > 0.8) * 2 + (stress >= 0.9)
+        keys[macros < 0] = -1
+
+        columns = [] # (fire ticks, rows, part codes, vectors, forces, stress) per plan
+        for key in np.unique(keys[keys >= 0]).tolist():
+            plan = self.library.compile_plan(self.macros[key // 4], bool(key & 2), bool(key & 1))
+            if plan is None:
+                continue # Unknown macro
+            group = np.nonzero(keys == key)[0]
+            steps = len(plan)
+            fire = current_tick + np.tile(plan.offset_array, len(group))
+
+            # Feature: Anticipatory Error (The Flinch), for steps with a positive offset
+            deferred = np.zeros(steps, dtype=bool)
+            deferred[plan.deferred] = True
+            deferred = np.tile(deferred, len(group))
+            step_stress = np.repeat(stress[group], steps)
+            flinching = np.nonzero(deferred & (step_stress > 0.7))[0]
+            flinched = flinching[np.random.random(len(flinching)) < step_stress[flinching] * 0.5]
+            fire[flinched] = current_tick
+
+            columns.append((fire, np.repeat(rows[group], steps), np.tile(plan.part_codes, len(group)),
+                            np.tile(plan.vector_array, (len(group), 1)), np.tile(plan.force_array, len(group)),
+                            step_stress))
+        if not columns:
+            return 0
+        fire, cmd_rows, parts, vectors, forces, cmd_stress = (np.concatenate(column) for column in zip(*columns))
+        m1_bank.receive_batch(fire, cmd_rows, parts, vectors, forces, cmd_stress)
+        return len(cmd_rows)
+
+    _rows = ('ids', 'mirror_prepared_macro')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, ids):
+        """Appends fresh PMCs for new entity IDs."""
+        fresh = SyntheticPMCBank(len(ids), ids, self.library)
+        for name in self._rows:
+            setattr(self, name, np.concatenate([getattr(self, name), getattr(fresh, name)]))
+
+    def compact(self, keep):
+        """Drops rows where `keep` is False."""
+        for name in self._rows:
+            setattr(self, name, getattr(self, name)[keep])
+
+    def process_mirror_neurons(self, macro_counts, xs, ys, own_macros=None):
+        """
+        Batched process_mirror_neurons. macro_counts is a (macro, height, width)
+        neighbourhood histogram and xs, ys are each entity's cell. The histogram
+        counts the entity itself, so its own macro (own_macros, NO_MACRO for none)
+        is taken back out. Sets and returns mirror_prepared_macro: per entity, the
+        lowest-coded macro at least empathy_threshold peers perform, else NO_MACRO.
+        (The scalar version breaks ties by first sighting, which has no meaning here.)
+        """
+        observed = macro_counts[:, ys, xs] # (macro, N), a copy
+        if own_macros is not None:
+            own_macros = np.asarray(own_macros)
+            acting = np.nonzero(own_macros >= 0)[0]
+            observed[own_macros[acting], acting] -= 1
+        fires = observed >= self.empathy_threshold
+        self.mirror_prepared_macro = np.where(fires.any(axis=0), fires.argmax(axis=0), NO_MACRO)
+        return self.mirror_prepared_macro
@@ -0,0 +1,65 @@
+import json
+import time
+
+class TickProfiler:
+    """
+    Accumulates wall time and call counts per tick phase, plus event counters.
+    EdenOfShadows only touches it when profiling is enabled, so a disabled
+    profiler costs one `is None` check per phase.
+    """
+    def __init__(self):
+        self.phases = {} # name -> [total seconds, calls]
+        self.counters = {}
+        self.ticks = 0
+
+    def start(self):
+        return time.perf_counter()
+
+    def lap(self, name, since):
+        """Charges the time since `since` to phase `name`; returns now for the next lap."""
+        now = time.perf_counter()
+        entry = self.phases.get(name)
+        if entry is None:
+            entry = self.phases[name] = [0.0, 0]
+        entry[0] += now - since
+        entry[1] += 1
+        return now
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        self.phases.clear()
+        self.counters.clear()
+        self.ticks = 0
+
+    def report(self):
+        """Plain dict of totals, per-call means and each phase's share of profiled time."""
+        total = sum(seconds for seconds, _ in self.phases.values())
+        return {
+            'ticks': self.ticks,
+            'total_seconds': total,
+            'phases': {
+                name: {
+                    'seconds': seconds,
+                    'calls': calls,
+                    'mean_ms': 1e3 * seconds / calls if calls else 0.0,
+                    'share': seconds / total if total else 0.0,
+                }
+                for name, (seconds, calls) in self.phases.items()
+            },
+            'counters': dict(self.counters),
+        }
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def format(self):
+        rep = self.report()
+        lines = [f"Profiled {rep['ticks']} ticks, {rep['total_seconds']:.3f}s"]
+        for name, row in sorted(rep['phases'].items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f"  {name:<14} {row['seconds']:8.3f}s  {row['mean_ms']:8.3f} ms/tick  {row['share']:6.1%}")
+        for name, value in rep['counters'].items():
+            lines.append(f"  {name:<14} {value}")
+        return "\n".join(lines)
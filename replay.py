@@ -0,0 +1,261 @@
+import json
+import os
+import struct
+import numpy as np
+from population import ACTIONS
+from snapshot import save_snapshot, Snapshot
+
+# Log layout (append-only):
+#   b"EDENRPL1" | uint32 header length | JSON header {width, height, layer_sizes, keyframe_every}
+#   then any number of blocks, each written with a single write():
+#     b"RPLC" | int64 first tick | uint32 ticks | uint64 body length | tick records
+#     b"RPLK" | int64 tick | uint32 name length | keyframe file name (next to the log)
+# A tick record is everything random that happened during EdenOfShadows.step():
+#   TICK | food uint32[spawned] | actions uint8[movers] | deaths int64[dead] | parents int64[births]
+#   then per BitNet layer: uint32 sites | sites int64[...] | values int8[...]
+# Food spawns are flat cells (y * width + x), mutation sites are flat indices into
+# the tick's stacked offspring of that layer. Eating follows from the moves, so it
+# is not logged. A keyframe is a snapshot.py file of the world after that many ticks.
+MAGIC = b"EDENRPL1"
+CHUNK_MARKER = b"RPLC"
+KEYFRAME_MARKER = b"RPLK"
+CHUNK = struct.Struct('<qIQ')
+KEYFRAME = struct.Struct('<qI')
+TICK = struct.Struct('<qIIII') # tick, spawned, movers, dead, births
+SITES = struct.Struct('<I')
+
+
+class ReplayRecorder:
+    """
+    Records every EdenOfShadows.step() of a vectorized world into an event log at `path`.
+
+    Tick records are kept in memory and appended as one block once `chunk_bytes`
+    have piled up; every `keyframe_every` ticks the block is cut and the whole
+    world is saved with save_snapshot next to the log, so ReplayLog.seek never
+    replays more than `keyframe_every` ticks. Recording starts with a keyframe
+    of the world as it is; close() writes the last partial block. BrainPipeline
+    refuses to tick a world while a recorder is attached.
+    """
+    def __init__(self, env, path, keyframe_every=1000, chunk_bytes=1 << 22):
+        if env.population is None:
+            raise ValueError("Replay logs need the vectorized engine")
+        self.env = env
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self.chunk_bytes = chunk_bytes
+        self.keyframes = []
+        self._parts = []
+        self._pending = 0
+        self._first_tick = None
+        self._ticks = 0
+
+        self._file = open(path, 'wb')
+        header = json.dumps({
+            'width': env.width, 'height': env.height,
+            'layer_sizes': list(env.population.layer_sizes), 'keyframe_every': keyframe_every,
+        }).encode()
+        self._file.write(MAGIC + struct.pack('<I', len(header)) + header)
+        env.recorder = self
+        env.population.record_births = True
+        self._keyframe(env)
+
+    def record(self, env, spawned, actions, dead):
+        """Called by EdenOfShadows._step_vectorized once the tick's births are in."""
+        pop = env.population
+        empty = np.zeros(0, dtype=np.int64)
+        actions = empty if actions is None else actions
+        dead = empty if dead is None else dead
+        parents, mutations = pop.last_births or (empty, [(empty, empty)] * len(pop.weights))
+        pop.last_births = None
+
+        parts = [
+            TICK.pack(env.tick, len(spawned), len(actions), len(dead), len(parents)),
+            spawned.astype(np.uint32).tobytes(), actions.astype(np.uint8).tobytes(),
+            dead.astype(np.int64).tobytes(), parents.astype(np.int64).tobytes(),
+        ]
+        for sites, values in mutations:
+            parts += [SITES.pack(len(sites)), sites.astype(np.int64).tobytes(), values.astype(np.int8).tobytes()]
+        if self._first_tick is None:
+            self._first_tick = env.tick
+        self._ticks += 1
+        self._parts += parts
+        self._pending += sum(len(part) for part in parts)
+        if self._pending >= self.chunk_bytes:
+            self.flush()
+
+    def checkpoint(self, env):
+        """Called by EdenOfShadows.step after the tick counter moves on."""
+        if env.tick % self.keyframe_every == 0:
+            self._keyframe(env)
+
+    def _keyframe(self, env):
+        self.flush()
+        name = f"{os.path.basename(self.path)}.{env.tick}.key"
+        save_snapshot(env, os.path.join(os.path.dirname(self.path), name))
+        self._file.write(KEYFRAME_MARKER + KEYFRAME.pack(env.tick, len(name)) + name.encode())
+        self._file.flush()
+        self.keyframes.append(env.tick)
+
+    def flush(self):
+        if self._ticks == 0:
+            return
+        body = b"".join(self._parts)
+        self._file.write(CHUNK_MARKER + CHUNK.pack(self._first_tick, self._ticks, len(body)) + body)
+        self._file.flush()
+        self._parts = []
+        self._pending = 0
+        self._first_tick = None
+        self._ticks = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        if self.env.recorder is self:
+            self.env.recorder = None
+            self.env.population.record_births = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayLog:
+    """
+    A replay log opened for reading: an index of its blocks and keyframes.
+    seek(tick) rebuilds the world after `tick` ticks from the nearest keyframe
+    at or before it, applying the logged events without running a network or
+    drawing a random number.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.chunks = [] # (first tick, ticks, body offset, body length)
+        self.keyframes = [] # (tick, snapshot path)
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an Eden replay log")
+            (header_len,) = struct.unpack('<I', f.read(4))
+            self.header = json.loads(f.read(header_len))
+            offset = len(MAGIC) + 4 + header_len
+            while True:
+                marker = f.read(4)
+                if marker == CHUNK_MARKER:
+                    head = f.read(CHUNK.size)
+                    if len(head) < CHUNK.size:
+                        break
+                    first, ticks, length = CHUNK.unpack(head)
+                    body_offset = offset + 4 + CHUNK.size
+                    if body_offset + length > os.fstat(f.fileno()).st_size:
+                        break # Block still being written
+                    self.chunks.append((first, ticks, body_offset, length))
+                    f.seek(length, 1)
+                    offset = body_offset + length
+                elif marker == KEYFRAME_MARKER:
+                    head = f.read(KEYFRAME.size)
+                    if len(head) < KEYFRAME.size:
+                        break
+                    tick, name_len = KEYFRAME.unpack(head)
+                    name = f.read(name_len)
+                    if len(name) < name_len:
+                        break
+                    self.keyframes.append((tick, os.path.join(os.path.dirname(path), name.decode())))
+                    offset += 4 + KEYFRAME.size + name_len
+                else:
+                    break
+        self.n_layers = len(self.header['layer_sizes']) - 1
+
+    @property
+    def first_tick(self):
+        return self.keyframes[0][0]
+
+    @property
+    def last_tick(self):
+        """The newest tick a world can be rebuilt at."""
+        if self.chunks:
+            first, ticks, _, _ = self.chunks[-1]
+            return max(first + ticks, self.keyframes[-1][0])
+        return self.keyframes[-1][0]
+
+    def seek(self, tick):
+        """A fresh EdenOfShadows as it was after `tick` ticks."""
+        if not self.keyframes or not self.first_tick <= tick <= self.last_tick:
+            raise ValueError(f"Tick {tick} is not in this replay log")
+        start, snapshot = max((kf for kf in self.keyframes if kf[0] <= tick), key=lambda kf: kf[0])
+        # The RNG is left alone: a replayed world only matches the live one's draws at a keyframe
+        env = Snapshot(snapshot).build_world(restore_rng=False)
+        return self.play(env, tick)
+
+    def play(self, env, tick):
+        """Applies the logged ticks from env.tick up to `tick` to env in place."""
+        for record in self.records(env.tick, tick):
+            apply_tick(env, record)
+        return env
+
+    def records(self, start, stop):
+        """Decoded tick records for ticks [start, stop), in order."""
+        with open(self.path, 'rb') as f:
+            for first, ticks, offset, length in self.chunks:
+                if first + ticks <= start or first >= stop:
+                    continue
+                f.seek(offset)
+                body = f.read(length)
+                pos = 0
+                for _ in range(ticks):
+                    record, pos = self._decode(body, pos)
+                    if record['tick'] >= stop:
+                        return
+                    if record['tick'] >= start:
+                        yield record
+
+    def _decode(self, body, pos):
+        tick, spawned, movers, dead, births = TICK.unpack_from(body, pos)
+        pos += TICK.size
+        record = {'tick': tick}
+        for name, dtype, count in (('food', np.uint32, spawned), ('actions', np.uint8, movers),
+                                   ('deaths', np.int64, dead), ('parents', np.int64, births)):
+            record[name] = np.frombuffer(body, dtype=dtype, count=count, offset=pos)
+            pos += count * np.dtype(dtype).itemsize
+        record['mutations'] = []
+        for _ in range(self.n_layers):
+            (count,) = SITES.unpack_from(body, pos)
+            pos += SITES.size
+            sites = np.frombuffer(body, dtype=np.int64, count=count, offset=pos)
+            values = np.frombuffer(body, dtype=np.int8, count=count, offset=pos + 8 * count)
+            record['mutations'].append((sites, values))
+            pos += 9 * count
+        return record, pos
+
+
+def apply_tick(env, record):
+    """
+    One logged tick applied to a vectorized world, in _step_vectorized's order:
+    food, metabolism, the logged moves, eating, the logged deaths, then the
+    logged births with their recorded mutations.
+    """
+    if env.tick != record['tick']:
+        raise ValueError(f"Record for tick {record['tick']} applied to a world at tick {env.tick}")
+    env.tick_births = env.tick_deaths = env.tick_food_eaten = 0
+    env.tick_actions[:] = 0
+    pop = env.population
+    food = env.food
+
+    food.cells.reshape(-1)[record['food']] = True
+    food.count += len(record['food'])
+    if pop.size:
+        pop.metabolize()
+        actions = record['actions'].astype(np.int64)
+        pop.move(actions, env.width, env.height)
+        env.tick_actions[:] = np.bincount(actions, minlength=len(ACTIONS))
+        eaters = pop.eat(food.cells)
+        food.remove_many(pop.x[eaters], pop.y[eaters])
+        env.tick_food_eaten = len(eaters)
+
+        n = pop.size
+        pop.alive[:n] = ~np.isin(pop.ids[:n], record['deaths'])
+        env.tick_deaths = pop.compact()
+
+    parents = np.searchsorted(pop.ids[:pop.size], record['parents'])
+    env.tick_births = len(pop.spawn_children(parents, record['mutations']))
+    env._population_index = None
+    env.tick += 1
@@ -0,0 +1,283 @@
+import random
+import time
+import multiprocessing as mp
+import numpy as np
+from food import FoodGrid, gather_vision
+from population import Population
+
+# Vision reaches one cell past the entity, so shards only need one halo row each side
+HALO = 1
+
+
+def _entity_batch(entities):
+    """Packs (entity, x, y) triples into the dict-of-arrays format Population.take produces."""
+    return {
+        'x': np.array([x for _, x, _ in entities], dtype=np.int64),
+        'y': np.array([y for _, _, y in entities], dtype=np.int64),
+        'calories': np.array([e.calories for e, _, _ in entities], dtype=np.float64),
+        'metabolism': np.array([e.metabolism for e, _, _ in entities], dtype=np.float64),
+        'movement_cost': np.array([e.movement_cost for e, _, _ in entities], dtype=np.float64),
+        'weights': [
+            np.stack([e.genome.layers[i].weights for e, _, _ in entities])
+            for i in range(len(entities[0][0].genome.layers))
+        ],
+    }
+
+
+class WorldShard:
+    """
+    One horizontal strip [row_start, row_end) of the toroidal world.
+    Owns the entities standing in its rows and the food growing there; the rows
+    just above and below are borrowed from the neighbouring shards each tick.
+    Entity IDs are local to the shard and are reissued when an entity migrates.
+    """
+    def __init__(self, width, height, row_starts, index, max_food):
+        self.width = width
+        self.height = height
+        self.row_starts = np.asarray(row_starts)
+        self.row_start = int(row_starts[index])
+        self.row_end = int(row_starts[index + 1]) if index + 1 < len(row_starts) else height
+        self.index = index
+        self.max_food = max_food
+
+        self.population = Population()
+        # Local food rows: cells[0] is grid row row_start
+        self.food = FoodGrid(width, self.row_end - self.row_start)
+
+    def add(self, batch):
+        self.population.extend_from(batch)
+
+    def borders(self):
+        """Spawns this tick's food and returns (top rows, bottom rows) for the neighbours' halos."""
+        self.food.spawn(self.max_food)
+        return self.food.cells[:HALO].copy(), self.food.cells[-HALO:].copy()
+
+    def act(self, halo_above, halo_below):
+        """
+        Metabolism, vision, decision and movement for every owned entity.
+        Returns {shard index: batch} for entities that walked out of the strip.
+        """
+        pop = self.population
+        if pop.size == 0:
+            return {}
+
+        pop.metabolize()
+        padded = np.vstack([halo_above, self.food.cells, halo_below])
+        n = pop.size
+        vision = gather_vision(padded, pop.x[:n], pop.y[:n] - self.row_start + HALO, radius=HALO)
+        actions = pop.decide(vision)
+        pop.move(actions, self.width, self.height)
+
+        owners = np.searchsorted(self.row_starts, pop.y[:n], side='right') - 1
+        leaving = np.nonzero(owners != self.index)[0]
+        if len(leaving) == 0:
+            return {}
+
+        outgoing = {}
+        for dest in np.unique(owners[leaving]).tolist():
+            slots = leaving[owners[leaving] == dest]
+            outgoing[dest] = pop.take(slots)
+        pop.alive[:n] = True
+        pop.alive[leaving] = False
+        pop.compact()
+        return outgoing
+
+    def settle(self, arrivals):
+        """Takes in migrants, then resolves food, death and reproduction. Returns tick stats."""
+        pop = self.population
+        for batch in arrivals:
+            pop.extend_from(batch)
+
+        eaters = pop.eat(self.food.cells, row_offset=self.row_start)
+        self.food.remove_many(pop.x[eaters], pop.y[eaters] - self.row_start)
+        deaths = pop.cull()
+        births = len(pop.reproduce())
+        return {'population': pop.size, 'food': self.food.count, 'births': births, 'deaths': deaths}
+
+    def snapshot(self):
+        """Positions and calories of every owned entity."""
+        n = self.population.size
+        pop = self.population
+        return {'x': pop.x[:n].copy(), 'y': pop.y[:n].copy(), 'calories': pop.calories[:n].copy()}
+
+
+def _shard_worker(conn, shard_args, seed):
+    np.random.seed(seed)
+    shard = WorldShard(*shard_args)
+    while True:
+        method, args = conn.recv()
+        if method is None:
+            break
+        conn.send(getattr(shard, method)(*args))
+    conn.close()
+
+
+class _LocalShard:
+    """
+    A WorldShard run in this process on its own np.random stream, seeded as
+    _shard_worker seeds a worker process. The caller's global RNG state is
+    swapped out around every call and put back afterwards.
+    """
+    def __init__(self, shard_args, seed):
+        self.shard = WorldShard(*shard_args)
+        self._state = np.random.RandomState(seed).get_state()
+
+    def call(self, method, *args):
+        caller = np.random.get_state()
+        np.random.set_state(self._state)
+        try:
+            return getattr(self.shard, method)(*args)
+        finally:
+            self._state = np.random.get_state()
+            np.random.set_state(caller)
+
+
+class ShardedEden:
+    """
+    EdenOfShadows split into horizontal strips, one per worker process.
+
+    Each tick runs in three rounds coordinated by this process:
+      1. every shard spawns food and reports its border rows,
+      2. shards receive their neighbours' borders as vision halos, act and move,
+         and hand back entities that crossed a strip edge,
+      3. migrants are delivered to their new owners, who then resolve eating,
+         death and reproduction.
+    The food budget is split across strips in proportion to their area, so the
+    world follows a single vectorized EdenOfShadows's statistics (test_sharded
+    compares seed-averaged population and food) but not its random stream.
+    use_processes=False runs the same shards in-process (handy for debugging),
+    each on its own np.random stream, so a seed gives the same world either way
+    and the caller's global RNG is left alone.
+    """
+    def __init__(self, width=50, height=50, max_food=100, workers=2, seed=None, use_processes=True):
+        if not 1 <= workers <= height:
+            raise ValueError(f"workers must be between 1 and height ({height})")
+        self.width = width
+        self.height = height
+        self.max_food = max_food
+        self.workers = workers
+
+        self.row_starts = np.linspace(0, height, workers + 1).astype(np.int64)[:-1]
+        rows = np.diff(np.append(self.row_starts, height))
+        # Proportional food quotas, remainder handed to the largest fractional shares
+        exact = max_food * rows / height
+        quotas = np.floor(exact).astype(np.int64)
+        quotas[np.argsort(quotas - exact)[:max_food - quotas.sum()]] += 1
+
+        seeds = np.random.SeedSequence(seed).generate_state(workers)
+        self._pending = [[] for _ in range(workers)]
+        self.population_size = 0
+        self.food_count = 0
+        self.births = 0
+        self.deaths = 0
+
+        shard_args = [(width, height, self.row_starts, i, int(quotas[i])) for i in range(workers)]
+        if use_processes:
+            self._conns = []
+            self._procs = []
+            for args, shard_seed in zip(shard_args, seeds.tolist()):
+                parent_conn, child_conn = mp.Pipe()
+                proc = mp.Process(target=_shard_worker, args=(child_conn, args, shard_seed), daemon=True)
+                proc.start()
+                child_conn.close()
+                self._conns.append(parent_conn)
+                self._procs.append(proc)
+            self._shards = None
+        else:
+            self._shards = [_LocalShard(args, shard_seed) for args, shard_seed in zip(shard_args, seeds.tolist())]
+
+    def _call(self, method, per_shard_args):
+        if self._shards is not None:
+            return [shard.call(method, *args) for shard, args in zip(self._shards, per_shard_args)]
+        for conn, args in zip(self._conns, per_shard_args):
+            conn.send((method, args))
+        return [conn.recv() for conn in self._conns]
+
+    def _owner(self, y):
+        return int(np.searchsorted(self.row_starts, y, side='right') - 1)
+
+    def add_entity(self, entity, x=None, y=None):
+        """Queues a LiminalEntity for the shard that owns (x, y); it joins at the next step."""
+        if x is None or y is None:
+            x = random.randint(0, self.width - 1)
+            y = random.randint(0, self.height - 1)
+        self._pending[self._owner(y)].append((entity, x, y))
+        self.population_size += 1
+
+    def __len__(self):
+        return self.population_size
+
+    def step(self):
+        if any(self._pending):
+            targets = [i for i, queued in enumerate(self._pending) if queued]
+            for i in targets:
+                batch = _entity_batch(self._pending[i])
+                if self._shards is not None:
+                    self._shards[i].call('add', batch)
+                else:
+                    self._conns[i].send(('add', (batch,)))
+                    self._conns[i].recv()
+            self._pending = [[] for _ in range(self.workers)]
+
+        # Round 1: food + border rows
+        borders = self._call('borders', [()] * self.workers)
+
+        # Round 2: act with halos from the strips above and below (wrapping around the torus)
+        halos = [(borders[i - 1][1], borders[(i + 1) % self.workers][0]) for i in range(self.workers)]
+        outgoing = self._call('act', halos)
+
+        # Round 3: hand migrants to their new owners, then eat / die / reproduce
+        arrivals = [[out[i] for out in outgoing if i in out] for i in range(self.workers)]
+        stats = self._call('settle', [(batch,) for batch in arrivals])
+
+        self.population_size = sum(s['population'] for s in stats)
+        self.food_count = sum(s['food'] for s in stats)
+        self.births = sum(s['births'] for s in stats)
+        self.deaths = sum(s['deaths'] for s in stats)
+
+    def gather(self):
+        """Concatenated x, y and calories of the whole population."""
+        parts = self._call('snapshot', [()] * self.workers)
+        return {key: np.concatenate([p[key] for p in parts]) for key in ('x', 'y', 'calories')}
+
+    def close(self):
+        if self._shards is None:
+            for conn in self._conns:
+                conn.send((None, None))
+            for proc in self._procs:
+                proc.join()
+            self._conns = []
+            self._procs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark_scaling(max_workers=None, width=2000, height=2000, max_food=400000,
+                      population=200000, ticks=20, seed=0):
+    """Ticks per second of a ShardedEden for 1..max_workers processes on the same starting world."""
+    from entity import LiminalEntity
+
+    max_workers = max_workers or mp.cpu_count()
+    results = []
+    for workers in range(1, max_workers + 1):
+        random.seed(seed)
+        np.random.seed(seed)
+        with ShardedEden(width, height, max_food, workers=workers, seed=seed) as world:
+            for _ in range(population):
+                world.add_entity(LiminalEntity(calories=200))
+            world.step() # Warm-up tick absorbs the initial entity transfer
+            start = time.perf_counter()
+            for _ in range(ticks):
+                world.step()
+            elapsed = time.perf_counter() - start
+        results.append({'workers': workers, 'ticks_per_sec': ticks / elapsed, 'population': len(world)})
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_scaling():
+        print(f"Workers: {row['workers']} | {row['ticks_per_sec']:.2f} ticks/sec | Population: {row['population']}")
@@ -0,0 +1,199 @@
+import json
+import os
+import random
+import struct
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+from evolution import BitNetGenome
+
+# File layout:
+#   8-byte magic | uint32 version | uint32 header length | JSON header | arrays...
+# Every array starts on a 64-byte boundary at the offset recorded in the header,
+# so a reader can np.memmap each one in place without parsing anything else.
+MAGIC = b"EDENSNAP"
+VERSION = 1
+ALIGN = 64
+
+
+def _world_arrays(env):
+    """Flat arrays describing every entity, the food bitmap and both RNG states."""
+    if env.population is not None:
+        pop = env.population
+        n = pop.size
+        columns = {
+            'ids': pop.ids[:n], 'x': pop.x[:n], 'y': pop.y[:n],
+            'calories': pop.calories[:n], 'metabolism': pop.metabolism[:n],
+            'movement_cost': pop.movement_cost[:n],
+        }
+        genome = np.concatenate([w[:n].reshape(n, -1) for w in pop.weights], axis=1)
+    else:
+        entities = list(env.entities)
+        columns = {
+            'ids': np.array([e.id for e in entities], dtype=np.int64),
+            'x': np.array([e.x for e in entities], dtype=np.int64),
+            'y': np.array([e.y for e in entities], dtype=np.int64),
+            'calories': np.array([e.calories for e in entities], dtype=np.float64),
+            'metabolism': np.array([e.metabolism for e in entities], dtype=np.float64),
+            'movement_cost': np.array([e.movement_cost for e in entities], dtype=np.float64),
+        }
+        genome = np.array(
+            [np.concatenate([layer.weights.ravel() for layer in e.genome.layers]) for e in entities],
+            dtype=np.int8
+        ).reshape(len(entities), -1)
+        # Packed genomes come back packed (their weights are stored unpacked like the rest)
+        columns['packed'] = np.array([e.genome.packed for e in entities], dtype=bool)
+
+    _, py_state, py_gauss = random.getstate()
+    _, np_keys, np_pos, np_has_gauss, np_gauss = np.random.get_state()
+    arrays = dict(columns)
+    arrays['genome'] = np.ascontiguousarray(genome, dtype=np.int8)
+    arrays['food'] = np.packbits(env.food.cells)
+    arrays['random_state'] = np.array(py_state, dtype=np.uint32)
+    arrays['np_random_state'] = np.asarray(np_keys, dtype=np.uint32)
+    rng = {'py_gauss': py_gauss, 'np_pos': int(np_pos), 'np_has_gauss': int(np_has_gauss), 'np_gauss': float(np_gauss)}
+    return arrays, rng
+
+
+def _layer_sizes(env):
+    if env.population is not None:
+        return list(env.population.layer_sizes)
+    for entity in env.entities:
+        return list(entity.genome.layer_sizes)
+    return [10, 16, 5]
+
+
+def save_snapshot(env, path):
+    """Writes the whole world to `path` as raw arrays plus a small JSON header (no pickling)."""
+    arrays, rng = _world_arrays(env)
+    layout = {}
+    offset = 0
+    for name, arr in arrays.items():
+        layout[name] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+
+    header = {
+        'width': env.width, 'height': env.height, 'max_food': env.max_food,
+        'engine': env.engine, 'tick': env.tick, 'food_count': env.food.count,
+        'mutation_rates': env.mutation_rates,
+        'next_id': int(env.population.next_id if env.population is not None else env._entities.next_id),
+        'layer_sizes': _layer_sizes(env), 'rng': rng, 'arrays': layout,
+    }
+    header_bytes = json.dumps(header).encode()
+    preamble = len(MAGIC) + 8 + len(header_bytes)
+    data_start = -(-preamble // ALIGN) * ALIGN
+
+    # Written beside `path` and swapped in: a world resumed from `path` still reads
+    # its columns from the old file through memmaps, so it must not be truncated under it
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<II', VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            arr.tofile(f)
+        # Pad so the final array's aligned extent exists on disk
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+class Snapshot:
+    """
+    A snapshot file opened for reading. Arrays are memory-mapped copy-on-write,
+    so opening costs nothing up front and the world built from it can be mutated
+    without touching the file.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an Eden snapshot")
+            version, header_len = struct.unpack('<II', f.read(8))
+            if version != VERSION:
+                raise ValueError(f"Unsupported snapshot version {version}")
+            self.header = json.loads(f.read(header_len))
+        preamble = len(MAGIC) + 8 + header_len
+        self._data_start = -(-preamble // ALIGN) * ALIGN
+
+    def __getitem__(self, name):
+        spec = self.header['arrays'][name]
+        shape = tuple(spec['shape'])
+        if 0 in shape:
+            return np.zeros(shape, dtype=spec['dtype'])
+        return np.memmap(self.path, dtype=spec['dtype'], mode='c',
+                         offset=self._data_start + spec['offset'], shape=shape)
+
+    def build_world(self, restore_rng=True):
+        """Materialises an EdenOfShadows from this snapshot."""
+        h = self.header
+        env = EdenOfShadows(width=h['width'], height=h['height'], max_food=h['max_food'], engine=h['engine'],
+                            mutation_rates=h.get('mutation_rates'))
+        env.tick = h['tick']
+
+        env.food.cells[:] = np.unpackbits(self['food'], count=h['width'] * h['height']) \
+            .reshape(h['height'], h['width']).astype(bool)
+        env.food.count = h['food_count']
+
+        n = h['arrays']['ids']['shape'][0]
+        genome = self['genome']
+        layer_sizes = h['layer_sizes']
+        # Column ranges of each layer inside the flat genome block
+        bounds = np.cumsum([0] + [a * b for a, b in zip(layer_sizes[:-1], layer_sizes[1:])])
+
+        if env.population is not None:
+            pop = env.population
+            for name in ('ids', 'x', 'y', 'calories', 'metabolism', 'movement_cost'):
+                setattr(pop, name, self[name])
+            pop.alive = np.ones(n, dtype=bool)
+            # Strided views into the one genome block; nothing is copied until the population grows
+            pop.weights = [
+                genome[:, lo:hi].reshape(n, a, b)
+                for lo, hi, a, b in zip(bounds[:-1], bounds[1:], layer_sizes[:-1], layer_sizes[1:])
+            ]
+            pop.size = pop.capacity = n
+            pop.next_id = h['next_id']
+        else:
+            ids, xs, ys = self['ids'].tolist(), self['x'].tolist(), self['y'].tolist()
+            # Snapshots from before the flag existed hold only plain genomes
+            packed = self['packed'].tolist() if 'packed' in h['arrays'] else [False] * n
+            calories, metabolism, cost = self['calories'].tolist(), self['metabolism'].tolist(), self['movement_cost'].tolist()
+            for i in range(n):
+                entity = LiminalEntity(calories=calories[i])
+                entity.metabolism = metabolism[i]
+                entity.movement_cost = cost[i]
+                entity.genome = BitNetGenome.from_weights(layer_sizes, [
+                    np.array(genome[i, lo:hi]).reshape(a, b)
+                    for lo, hi, a, b in zip(bounds[:-1], bounds[1:], layer_sizes[:-1], layer_sizes[1:])
+                ], packed=packed[i])
+                entity.x, entity.y = xs[i], ys[i]
+                env.genome_pool.intern(entity.genome)
+                env._entities.add(entity, entity_id=ids[i])
+                env.spatial.insert(entity)
+            env._entities.next_id = h['next_id']
+
+        # Restore RNGs last: rebuilding LiminalEntity objects above draws random genomes
+        if restore_rng:
+            rng = h['rng']
+            random.setstate((3, tuple(self['random_state'].tolist()), rng['py_gauss']))
+            np.random.set_state(('MT19937', np.array(self['np_random_state']), rng['np_pos'],
+                                 rng['np_has_gauss'], rng['np_gauss']))
+        return env
+
+
+def load_snapshot(path):
+    """Resumes a world exactly where save_snapshot left it, RNG state included."""
+    return Snapshot(path).build_world(restore_rng=True)
+
+
+def fork_world(path, seed=None):
+    """
+    Clones a world from a snapshot as a new variant. The arrays stay shared
+    copy-on-write with the file; pass a seed to send the fork down its own
+    random trajectory instead of replaying the original's.
+    """
+    env = Snapshot(path).build_world(restore_rng=seed is None)
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    return env
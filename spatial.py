@@ -0,0 +1,192 @@
+import numpy as np
+
+class EntityRegistry:
+    """
+    Dense list of live entities with stable IDs.
+    Removal swaps the last entity into the freed slot, so it is O(1) instead
+    of list.remove's O(n); iteration order is therefore not insertion order.
+    """
+    def __init__(self):
+        self._items = []
+        self._slots = {} # entity id -> index into _items
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __contains__(self, entity):
+        slot = self._slots.get(getattr(entity, 'id', None))
+        return slot is not None and self._items[slot] is entity
+
+    def add(self, entity, entity_id=None):
+        """Registers an entity under a fresh ID (or a specific one, e.g. when restoring)."""
+        if entity_id is None:
+            entity_id = self.next_id
+        entity.id = entity_id
+        self.next_id = max(self.next_id, entity_id + 1)
+        self._slots[entity.id] = len(self._items)
+        self._items.append(entity)
+        return entity.id
+
+    def remove(self, entity):
+        slot = self._slots.pop(entity.id)
+        last = self._items.pop()
+        if last is not entity:
+            # Swap-remove: move the tail entity into the hole
+            self._items[slot] = last
+            self._slots[last.id] = slot
+
+    def get(self, entity_id):
+        slot = self._slots.get(entity_id)
+        return None if slot is None else self._items[slot]
+
+
+def _wrapped_buckets(center, radius, size, bucket_size):
+    """Bucket indices touched by [center - radius, center + radius] on a ring of `size` cells."""
+    if 2 * radius + 1 >= size:
+        return range((size + bucket_size - 1) // bucket_size)
+    return {((center + d) % size) // bucket_size for d in range(-radius, radius + 1)}
+
+
+def _torus_offset(a, b, size):
+    d = abs(a - b) % size
+    return min(d, size - d)
+
+
+class SpatialHash:
+    """
+    Cell-bucketed index of entity positions on the toroidal grid.
+    Each bucket covers bucket_size x bucket_size grid cells and holds the
+    entities currently inside it; moves only touch the two affected buckets.
+    """
+    def __init__(self, width, height, bucket_size=8):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        self._bucket_of = {} # entity id -> bucket key
+
+    def _key(self, x, y):
+        return (x // self.bucket_size, y // self.bucket_size)
+
+    def insert(self, entity):
+        key = self._key(entity.x, entity.y)
+        self.buckets.setdefault(key, set()).add(entity)
+        self._bucket_of[entity.id] = key
+
+    def remove(self, entity):
+        key = self._bucket_of.pop(entity.id)
+        bucket = self.buckets[key]
+        bucket.discard(entity)
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, entity):
+        """Re-files an entity after its x/y changed. O(1)."""
+        key = self._key(entity.x, entity.y)
+        old = self._bucket_of[entity.id]
+        if key != old:
+            bucket = self.buckets[old]
+            bucket.discard(entity)
+            if not bucket:
+                del self.buckets[old]
+            self.buckets.setdefault(key, set()).add(entity)
+            self._bucket_of[entity.id] = key
+
+    def query_radius(self, x, y, radius):
+        """Entities within Chebyshev distance `radius` of (x, y), wrapping at the edges."""
+        found = []
+        for bx in _wrapped_buckets(x, radius, self.width, self.bucket_size):
+            for by in _wrapped_buckets(y, radius, self.height, self.bucket_size):
+                for entity in self.buckets.get((bx, by), ()):
+                    if _torus_offset(entity.x, x, self.width) <= radius and \
+                            _torus_offset(entity.y, y, self.height) <= radius:
+                        found.append(entity)
+        return found
+
+    def query_cell(self, x, y):
+        """Entities standing exactly on (x, y)."""
+        return [e for e in self.buckets.get(self._key(x, y), ()) if e.x == x and e.y == y]
+
+
+class PopulationIndex:
+    """
+    Read-only bucket index over Population arrays, rebuilt in one sort.
+    The vectorized engine moves everyone at once, so instead of incremental
+    updates it sorts slots by bucket once and answers queries with slices.
+    """
+    def __init__(self, xs, ys, width, height, bucket_size=8):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.xs = xs
+        self.ys = ys
+        self.buckets_x = (width + bucket_size - 1) // bucket_size
+        n_buckets = self.buckets_x * ((height + bucket_size - 1) // bucket_size)
+
+        keys = (ys // bucket_size) * self.buckets_x + xs // bucket_size
+        self.order = np.argsort(keys, kind='stable')
+        self.starts = np.zeros(n_buckets + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=n_buckets), out=self.starts[1:])
+
+    def _candidates(self, x, y, radius):
+        parts = []
+        for bx in _wrapped_buckets(x, radius, self.width, self.bucket_size):
+            for by in _wrapped_buckets(y, radius, self.height, self.bucket_size):
+                key = by * self.buckets_x + bx
+                parts.append(self.order[self.starts[key]:self.starts[key + 1]])
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def query_radius(self, x, y, radius):
+        """Slots within Chebyshev distance `radius` of (x, y)."""
+        slots = self._candidates(x, y, radius)
+        dx = np.abs(self.xs[slots] - x) % self.width
+        dy = np.abs(self.ys[slots] - y) % self.height
+        near = (np.minimum(dx, self.width - dx) <= radius) & (np.minimum(dy, self.height - dy) <= radius)
+        return np.sort(slots[near])
+
+    def query_cell(self, x, y):
+        slots = self._candidates(x, y, 0)
+        return np.sort(slots[(self.xs[slots] == x) & (self.ys[slots] == y)])
+
+
+def _wrapped_box_sum(grid, radius, axis):
+    """Sum over the 2r+1 wrapped neighbours of every cell along one axis of a torus."""
+    size = grid.shape[axis]
+    if 2 * radius + 1 >= size:
+        # The window covers the whole ring: every cell sees each cell exactly once
+        return np.repeat(grid.sum(axis=axis, keepdims=True), size, axis=axis)
+
+    def along(start, stop):
+        return (slice(None),) * axis + (slice(start, stop),)
+
+    # Running sums over [tail | ring | head], after a leading zero
+    shape = list(grid.shape)
+    shape[axis] = size + 2 * radius + 1
+    running = np.zeros(shape, dtype=grid.dtype)
+    running[along(1, radius + 1)] = grid[along(size - radius, size)]
+    running[along(radius + 1, size + radius + 1)] = grid
+    running[along(size + radius + 1, None)] = grid[along(0, radius)]
+    np.cumsum(running, axis=axis, out=running)
+    return running[along(2 * radius + 1, None)] - running[along(0, size)]
+
+
+def neighbourhood_counts(xs, ys, codes, n_codes, width, height, radius):
+    """
+    (n_codes, height, width) tensor: counts[c, y, x] is how many of the given
+    positions carrying code c lie within Chebyshev distance `radius` of (x, y)
+    on the torus. Negative codes are skipped. Built as one scatter plus a
+    separable wrapped box sum, so it costs O(N + n_codes * cells) whatever the radius.
+    """
+    xs, ys, codes = (np.asarray(a, dtype=np.int64) for a in (xs, ys, codes))
+    coded = codes >= 0
+    flat = (codes[coded] * height + ys[coded]) * width + xs[coded]
+    counts = np.bincount(flat, minlength=n_codes * height * width).astype(np.int32)
+    rows = _wrapped_box_sum(counts.reshape(n_codes, height, width), radius, axis=1)
+    return _wrapped_box_sum(rows, radius, axis=2)
@@ -0,0 +1,158 @@
+import json
+import os
+import struct
+import numpy as np
+
+# File layout (append-only):
+#   b"EDENTLM1" | uint32 schema length | JSON schema {"columns": [[name, dtype], ...]}
+#   then any number of chunks: b"CHNK" | uint32 rows | column 0 raw | column 1 raw | ...
+# A chunk is written with a single write() and flushed, so a concurrent reader
+# either sees a whole chunk or a short tail it can ignore until the next poll.
+MAGIC = b"EDENTLM1"
+CHUNK_MARKER = b"CHNK"
+
+COLUMNS = (
+    ('tick', np.int64),
+    ('population', np.int64),
+    ('births', np.int64),
+    ('deaths', np.int64),
+    ('food', np.int64),
+    ('food_eaten', np.int64),
+    ('calories_mean', np.float64),
+    ('calories_p10', np.float64),
+    ('calories_p50', np.float64),
+    ('calories_p90', np.float64),
+    ('action_N', np.int64),
+    ('action_E', np.int64),
+    ('action_S', np.int64),
+    ('action_W', np.int64),
+    ('action_Stay', np.int64),
+)
+
+
+def _calories(env):
+    if env.population is not None:
+        return env.population.calories[:env.population.size]
+    return np.fromiter((e.calories for e in env.entities), dtype=np.float64, count=len(env.entities))
+
+
+class TelemetrySink:
+    """
+    Per-tick world metrics, buffered in preallocated column arrays and flushed
+    every `chunk_ticks` ticks as one columnar chunk appended to `path`.
+    Call record(env) right after env.step(); close() flushes the partial chunk.
+    """
+    def __init__(self, path, chunk_ticks=1024):
+        self.path = path
+        self.chunk_ticks = chunk_ticks
+        self.names = [name for name, _ in COLUMNS]
+        self._buffers = [np.zeros(chunk_ticks, dtype=dtype) for _, dtype in COLUMNS]
+        self._rows = 0
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab')
+        if new_file:
+            schema = json.dumps({'columns': [[name, np.dtype(dtype).str] for name, dtype in COLUMNS]}).encode()
+            self._file.write(MAGIC + struct.pack('<I', len(schema)) + schema)
+            self._file.flush()
+
+    def record(self, env):
+        calories = _calories(env)
+        i = self._rows
+        b = self._buffers # indexed in COLUMNS order
+        b[0][i] = env.tick
+        b[1][i] = len(calories)
+        b[2][i] = env.tick_births
+        b[3][i] = env.tick_deaths
+        b[4][i] = len(env.food)
+        b[5][i] = env.tick_food_eaten
+        if len(calories):
+            b[6][i] = calories.mean()
+            b[7][i], b[8][i], b[9][i] = np.percentile(calories, (10, 50, 90))
+        else:
+            b[6][i] = b[7][i] = b[8][i] = b[9][i] = np.nan
+        for j in range(5):
+            b[10 + j][i] = env.tick_actions[j]
+
+        self._rows += 1
+        if self._rows == self.chunk_ticks:
+            self.flush()
+
+    def flush(self):
+        if self._rows == 0:
+            return
+        n = self._rows
+        payload = b"".join(buf[:n].tobytes() for buf in self._buffers)
+        self._file.write(CHUNK_MARKER + struct.pack('<I', n) + payload)
+        self._file.flush()
+        self._rows = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TelemetryReader:
+    """
+    Incremental reader for a telemetry file that may still be growing.
+    Each poll() returns the columns of the chunks completed since the last poll.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.columns = None
+        self._offset = 0
+
+    def _read_schema(self, f):
+        head = f.read(len(MAGIC) + 4)
+        if len(head) < len(MAGIC) + 4:
+            return False
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not an Eden telemetry file")
+        (schema_len,) = struct.unpack('<I', head[len(MAGIC):])
+        schema = f.read(schema_len)
+        if len(schema) < schema_len:
+            return False
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in json.loads(schema)['columns']]
+        self._offset = len(MAGIC) + 4 + schema_len
+        return True
+
+    def poll(self):
+        parts = []
+        with open(self.path, 'rb') as f:
+            if self.columns is None and not self._read_schema(f):
+                return {}
+            row_bytes = sum(dtype.itemsize for _, dtype in self.columns)
+            f.seek(self._offset)
+            while True:
+                head = f.read(8)
+                if len(head) < 8 or head[:4] != CHUNK_MARKER:
+                    break
+                (rows,) = struct.unpack('<I', head[4:])
+                body = f.read(rows * row_bytes)
+                if len(body) < rows * row_bytes:
+                    break # Chunk still being written
+                parts.append(self._split(body, rows))
+                self._offset += 8 + len(body)
+        if not parts:
+            return {name: np.zeros(0, dtype=dtype) for name, dtype in self.columns}
+        return {name: np.concatenate([p[name] for p in parts]) for name, _ in self.columns}
+
+    def _split(self, body, rows):
+        out = {}
+        pos = 0
+        for name, dtype in self.columns:
+            size = rows * dtype.itemsize
+            out[name] = np.frombuffer(body, dtype=dtype, count=rows, offset=pos)
+            pos += size
+        return out
+
+
+def read_telemetry(path):
+    """Every complete chunk in `path` as a dict of column arrays."""
+    return TelemetryReader(path).poll()
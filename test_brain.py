@@ -0,0 +1,86 @@
+import random
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+from brain import BrainPipeline, STAGES
+
+def make_world(seed, population=40):
+    random.seed(seed)
+    np.random.seed(seed)
+    env = EdenOfShadows(width=30, height=30, max_food=80, engine="vectorized")
+    for _ in range(population):
+        env.add_entity(LiminalEntity(calories=200))
+    return env
+
+def run(env, stepper, ticks):
+    history = []
+    for _ in range(ticks):
+        stepper.step()
+        pop = env.population
+        history.append((pop.ids[:pop.size].copy(), pop.x[:pop.size].copy(), pop.y[:pop.size].copy(),
+                        pop.calories[:pop.size].copy(), env.tick_births, env.tick_deaths, env.tick_food_eaten))
+    return history
+
+def test_brain_pipeline():
+    print("Wiring PFC, PMC and M1 into the tick as population-wide stages...")
+
+    # 1. With the lobes switched off, the pipeline is the vectorized engine
+    print("\n[Lobes Off Test]")
+    plain_env = make_world(1)
+    plain = run(plain_env, plain_env, 60)
+    brain_env = make_world(1)
+    lizard = run(brain_env, BrainPipeline(brain_env, stages=("vision", "brainstem", "environment")), 60)
+    for a, b in zip(plain, lizard):
+        assert all(np.array_equal(x, y) for x, y in zip(a, b))
+    print(f"60 ticks identical to env.step(): population {len(plain[-1][0])}")
+
+    # 2. The full brain, mirror neurons on
+    print("\n[Full Pipeline Test]")
+    env = make_world(2)
+    brain = BrainPipeline(env, mirror_radius=1)
+    for tick in range(60):
+        brain.step()
+        pop = env.population
+        if tick % 20 == 0:
+            print(f"Tick {tick}: population {pop.size} | rules {np.bincount(brain.pfc.current_rule, minlength=5).tolist()}")
+        ids = pop.ids[:pop.size]
+        # Every lobe keeps one row per living entity, in population order
+        assert all(np.array_equal(bank.ids, ids) for bank in (brain.pfc, brain.pmc, brain.m1))
+    assert env.tick == 60 and env.population.size > 0
+
+    report = brain.timings()
+    print("Per-stage timings:")
+    for stage in STAGES:
+        print(f"  {stage:<12} {report['phases'][stage]['mean_ms']:.3f} ms/tick")
+    assert set(report['phases']) == set(STAGES) and report['ticks'] == 60
+
+    # 3. Stages can be switched off mid-run
+    print("\n[Stage Toggle Test]")
+    brain.disable('environment')
+    pop = env.population
+    before = (pop.size, pop.x[:pop.size].copy(), pop.y[:pop.size].copy(), len(env.food))
+    brain.step()
+    assert before[0] == pop.size and np.array_equal(before[1], pop.x[:pop.size])
+    assert np.array_equal(before[2], pop.y[:pop.size]) and env.tick_births == 0
+    print("Environment off: nobody moved, ate, died or was born")
+    brain.enable('environment')
+    brain.step()
+    assert env.tick == 62
+
+    try:
+        brain.disable('cerebellum')
+        assert False, "Unknown stages must be rejected"
+    except ValueError as error:
+        print(f"Rejected: {error}")
+
+    # The PMC has nowhere to send commands without M1
+    for attempt in (lambda: brain.disable('m1'), lambda: BrainPipeline(env, stages=("vision", "brainstem", "pmc"))):
+        try:
+            attempt()
+            assert False, "pmc without m1 must be rejected"
+        except ValueError as error:
+            print(f"Rejected: {error}")
+    assert brain.enabled['m1']
+
+if __name__ == "__main__":
+    test_brain_pipeline()
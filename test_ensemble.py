@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+from ensemble import run_ensemble, aggregate, load_results
+
+def test_ensemble_resume():
+    config = {'width': 20, 'height': 20, 'max_food': 30, 'ticks': 60, 'engine': "vectorized"}
+    results_path = os.path.join(tempfile.mkdtemp(), "ensemble.jsonl")
+
+    print("Running the first half of a 6-seed ensemble...")
+    first = run_ensemble(range(3), config=config, workers=2, results_path=results_path)
+    assert [s['seed'] for s in first] == [0, 1, 2]
+
+    # Simulate a crash that tore the last line mid-write
+    with open(results_path, 'a') as f:
+        f.write('{"seed": 3, "conf')
+
+    print("Resuming with all 6 seeds: only the 3 missing runs should execute...")
+    fresh = []
+    summaries = run_ensemble(range(6), config=config, workers=2, results_path=results_path, on_result=fresh.append)
+    print(f"Newly executed seeds: {sorted(s['seed'] for s in fresh)}")
+    assert sorted(s['seed'] for s in fresh) == [3, 4, 5]
+    assert [s['seed'] for s in summaries] == list(range(6))
+    # Nothing was glued onto the torn line: the file itself holds every seed
+    assert sorted(load_results(results_path, config)) == list(range(6))
+
+    # A torn tail from a resumed run is dropped the same way
+    with open(results_path, 'a') as f:
+        f.write('{"seed": 6, "conf')
+    run_ensemble(range(8), config=config, workers=2, results_path=results_path)
+    assert sorted(load_results(results_path, config)) == list(range(8))
+
+    # Re-running a seed reproduces its summary exactly
+    again = run_ensemble([1], config=config, workers=1, resume=False)[0]
+    assert json.dumps(again, sort_keys=True) == json.dumps(summaries[1], sort_keys=True)
+
+    # A fresh run (main.py --fresh) starts a new file instead of piling duplicates onto the old one
+    run_ensemble([1, 2], config=config, workers=2, results_path=results_path, resume=False)
+    with open(results_path) as f:
+        assert sorted(json.loads(line)['seed'] for line in f) == [1, 2]
+    assert sorted(load_results(results_path + ".prev", config)) == list(range(8))
+
+    stats = aggregate(summaries)
+    print(f"Final population percentiles: {stats['final_population']}")
+    assert stats['runs'] == 6
+
+if __name__ == "__main__":
+    test_ensemble_resume()
@@ -0,0 +1,65 @@
+import random
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+
+def test_food_bitmap_vision():
+    print("Seeding a small toroidal Eden with food...")
+    np.random.seed(3)
+    env = EdenOfShadows(width=12, height=9, max_food=30)
+    env.spawn_food()
+    food_set = set(env.food)
+    print(f"Food cells: {len(env.food)} (bitmap count {env.food.count})")
+    assert len(food_set) == 30
+
+    # The bulk vision matrix must agree with a brute-force wrapped set lookup
+    print("\n[Bulk Vision Test]")
+    xs = np.repeat(np.arange(env.width), env.height)
+    ys = np.tile(np.arange(env.height), env.width)
+    for radius in (1, 2):
+        bulk = env.get_local_vision_bulk(xs, ys, radius=radius)
+        for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+            expected = [
+                1 if ((x + dx) % env.width, (y + dy) % env.height) in food_set else 0
+                for dy in range(-radius, radius + 1)
+                for dx in range(-radius, radius + 1)
+            ]
+            assert bulk[i].tolist() == expected
+            assert env.get_local_vision(x, y, radius=radius) == expected
+        print(f"Radius {radius}: vision matrix {bulk.shape} matches the scalar shim everywhere")
+
+def test_spatial_queries():
+    print("Comparing spatial-index neighbourhood queries with a brute-force scan...")
+    for engine in ("object", "vectorized"):
+        random.seed(5)
+        np.random.seed(5)
+        env = EdenOfShadows(width=40, height=25, max_food=80, engine=engine)
+        for _ in range(150):
+            env.add_entity(LiminalEntity(calories=200))
+        for _ in range(5):
+            env.step()
+
+        def torus(a, b, size):
+            d = abs(a - b) % size
+            return min(d, size - d)
+
+        everyone = list(env.entities)
+        for x, y, radius in [(0, 0, 3), (39, 24, 5), (20, 12, 1), (7, 3, 0), (10, 10, 30)]:
+            near = sorted(e.id for e in env.entities_near(x, y, radius))
+            expected = sorted(
+                e.id for e in everyone
+                if torus(e.x, x, env.width) <= radius and torus(e.y, y, env.height) <= radius
+            )
+            assert near == expected
+            here = sorted(e.id for e in env.entities_at(x, y))
+            assert here == sorted(e.id for e in everyone if (e.x, e.y) == (x, y))
+        # Stable IDs survive deaths and swap-removes
+        target = everyone[len(everyone) // 2]
+        assert env.get_entity(target.id).id == target.id
+        env.remove_entity(target)
+        assert env.get_entity(target.id) is None
+        print(f"{engine}: {len(env.entities)} entities, radius and same-cell queries agree")
+
+if __name__ == "__main__":
+    test_food_bitmap_vision()
+    test_spatial_queries()
@@ -0,0 +1,228 @@
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+import random
+from evolution import (BitNetGenome, GenomePool, PackedBitNetLayer, PolicyTable, activation_quant_8bit, breed,
+                       mutate_stacked, pack_ternary, quantize_state, sample_sites, unpack_ternary)
+
+def test_packed_genome():
+    print("Packing ternary genomes at 2 bits per weight...")
+    np.random.seed(0)
+    weights = np.random.choice([-1, 0, 1], size=(10, 16)).astype(np.int8)
+    packed = pack_ternary(weights)
+    print(f"int8 matrix: {weights.nbytes} bytes -> packed: {packed.nbytes} bytes")
+    assert packed.nbytes * 4 == weights.nbytes
+    assert np.array_equal(unpack_ternary(packed, weights.shape), weights)
+
+    # Packed and unpacked genomes fed the same RNG stream must evolve identically
+    print("\n[Inheritance Test]")
+    np.random.seed(1)
+    plain = BitNetGenome(layer_sizes=[10, 16, 5])
+    np.random.seed(1)
+    compact = BitNetGenome(layer_sizes=[10, 16, 5], packed=True)
+    for generation in range(5):
+        seed = 10 + generation
+        np.random.seed(seed)
+        plain = BitNetGenome(layer_sizes=[10, 16, 5], parent_genes=plain.get_genes())
+        np.random.seed(seed)
+        compact = BitNetGenome(layer_sizes=[10, 16, 5], parent_genes=compact.get_genes())
+        assert all(isinstance(layer, PackedBitNetLayer) for layer in compact.layers)
+        for a, b in zip(plain.layers, compact.layers):
+            assert np.array_equal(a.weights, b.weights)
+
+    state = np.array([1, 0, 0, 1, 1, 0, 0, 0, 1, 0.8])
+    print(f"Generation 5 logits (plain):  {plain.forward(state)}")
+    print(f"Generation 5 logits (packed): {compact.forward(state)}")
+    assert np.array_equal(plain.forward(state), compact.forward(state))
+
+    # The lookup kernel against the int8 dot, wide layers and accumulator wrap-around included
+    for n_in, n_out in [(10, 16), (16, 5), (7, 3), (255, 33)]:
+        weights = np.random.choice([-1, 0, 1], size=(n_in, n_out)).astype(np.int8)
+        layer = PackedBitNetLayer(n_in, n_out, weights=weights)
+        assert np.array_equal(layer.weights, weights)
+        x = np.random.randint(-128, 128, size=n_in).astype(np.int8)
+        assert np.array_equal(layer.forward(x), np.dot(x, weights).astype(np.float32))
+
+def test_genome_pool():
+    print("\nInterning genomes by content...")
+    np.random.seed(2)
+    parent = BitNetGenome(layer_sizes=[10, 16, 5])
+    unchanged = 0
+    for _ in range(50):
+        child = BitNetGenome(layer_sizes=[10, 16, 5], parent_genes=parent.get_genes())
+        for mine, theirs in zip(child.layers, parent.layers):
+            # A layer is either still the parent's array or genuinely different from it
+            if mine.weights is theirs.weights:
+                unchanged += 1
+            else:
+                assert not np.array_equal(mine.weights, theirs.weights)
+    print(f"Layers inherited without a copy: {unchanged} of 100")
+    assert unchanged > 0
+    assert not parent.layers[0].weights.flags.writeable
+
+    pool = GenomePool()
+    evicted = []
+    pool.on_evict.append(evicted.append)
+    twins = [BitNetGenome.from_weights([10, 16, 5], [layer.weights.copy() for layer in parent.layers]) for _ in range(3)]
+    keys = {pool.intern(g) for g in twins}
+    assert len(keys) == 1 and pool.unique == 1 and pool.live == 3
+    assert twins[1].layers[0].weights is twins[0].layers[0].weights
+    pool.cache(twins[0])['note'] = "shared"
+    assert pool.cache(twins[2])['note'] == "shared"
+    stats = pool.stats()
+    print(f"Pool stats: {stats}")
+    assert stats['weight_bytes'] * 3 == stats['weight_bytes_unshared']
+    for g in twins:
+        pool.release(g)
+    assert pool.unique == 0 and pool.live == 0 and evicted == list(keys)
+
+    print("\n[World Test]")
+    np.random.seed(3)
+    env = EdenOfShadows(width=30, height=30, max_food=120)
+    for _ in range(20):
+        env.add_entity(LiminalEntity(calories=200))
+    for _ in range(60):
+        env.step()
+        assert env.genome_pool.live == len(env.entities)
+    print(f"{len(env.entities)} entities alive, {env.unique_genomes()} unique genomes")
+    assert 0 < env.unique_genomes() <= len(env.entities)
+
+def _world_history(policy_settings, seed=4, ticks=40):
+    random.seed(seed)
+    np.random.seed(seed)
+    env = EdenOfShadows(width=30, height=30, max_food=120)
+    if policy_settings is not None:
+        env.compile_policies(**policy_settings)
+    for _ in range(20):
+        env.add_entity(LiminalEntity(calories=200))
+    history = []
+    for _ in range(ticks):
+        env.step()
+        history.append(sorted((e.id, e.x, e.y, e.calories) for e in env.entities))
+    return history, env
+
+def test_policy_table():
+    print("\nCompiling genomes into policy lookup tables...")
+    np.random.seed(5)
+    genome = BitNetGenome(layer_sizes=[10, 16, 5])
+    exact = PolicyTable(genome, calorie_buckets=320, max_calories=320)
+    coarse = PolicyTable(genome)
+    distances = []
+    for _ in range(300):
+        vision = (np.random.rand(9) < 0.2).astype(int).tolist()
+        calories = np.random.randint(0, 320)
+        logits = genome.forward(np.array(vision + [calories / 200.0]))
+        e_x = np.exp(logits - np.max(logits))
+        probs = e_x / e_x.sum()
+        # One bucket per calorie value reproduces the forward pass bit for bit
+        assert np.array_equal(exact.lookup(vision, calories), probs)
+        distances.append(0.5 * np.abs(coarse.lookup(vision, calories) - probs).sum())
+    print(f"Mean total variation, {coarse.calorie_buckets} buckets: {np.mean(distances):.4f}")
+    assert np.mean(distances) < 0.1
+    assert exact.lookup([0] * 9, 320) is None and exact.lookup([0] * 9, -1) is None
+
+    print("\n[World Test]")
+    plain, _ = _world_history(None)
+    compiled, env = _world_history({'calorie_buckets': 320, 'max_calories': 320})
+    assert plain == compiled
+    print(f"Exact tables replay the uncompiled world: {len(plain[-1])} entities after {len(plain)} ticks")
+
+    # Tables live in the pool cache and go with the last entity carrying the genome
+    entity = next(iter(env.entities))
+    assert env.policy_table(entity.genome) is env.genome_pool.cache(entity.genome)['policy']
+    evicted = []
+    env.genome_pool.on_evict.append(evicted.append)
+    key = entity.genome.pool_key
+    holders = [e for e in env.entities if e.genome.pool_key == key]
+    for e in holders:
+        env.remove_entity(e)
+    assert evicted == [key] and env.policy_table(entity.genome) is None
+
+def test_batched_mutation():
+    print("\nSampling mutation sites from geometric gaps...")
+    np.random.seed(6)
+    size, rate, trials = 1000, 0.05, 400
+    counts = np.zeros(size)
+    hits = []
+    for _ in range(trials):
+        sites = sample_sites(size, rate)
+        assert np.all(np.diff(sites) > 0) and (len(sites) == 0 or 0 <= sites[0] and sites[-1] < size)
+        counts[sites] += 1
+        hits.append(len(sites))
+    print(f"Mean hits per {size} weights: {np.mean(hits):.2f} (expected {size * rate:.0f})")
+    assert abs(np.mean(hits) - size * rate) < 1.0
+    # Every position is equally likely, just like the old dense mask
+    assert abs(counts[:size // 2].mean() - counts[size // 2:].mean()) < 2.0
+
+    print("\n[Stacked Offspring]")
+    stacked = [np.zeros((500, 10, 16), dtype=np.int8), np.zeros((500, 16, 5), dtype=np.int8)]
+    touched = mutate_stacked(stacked, rates=[0.05, 0.0])
+    values = stacked[0].reshape(-1)[touched[0]]
+    print(f"Layer 0 sites: {len(touched[0])}, layer 1 sites: {len(touched[1])}")
+    assert len(touched[1]) == 0 and not stacked[1].any()
+    assert np.count_nonzero(stacked[0]) == np.count_nonzero(values)
+    assert all(abs(np.mean(values == v) - 1 / 3) < 0.05 for v in (-1, 0, 1))
+
+    print("\n[Breeding a batch]")
+    parents = [BitNetGenome(layer_sizes=[10, 16, 5]) for _ in range(200)]
+    children = breed(parents, rates=[0.05, 0.0])
+    for parent, child in zip(parents, children):
+        # Untouched layers are shared with the parent, mutated ones are fresh copies
+        assert child.layers[1].weights is parent.layers[1].weights
+        if child.layers[0].weights is not parent.layers[0].weights:
+            assert not np.array_equal(child.layers[0].weights, parent.layers[0].weights)
+            # ...that own their memory, so a survivor does not pin its siblings' weights
+            assert child.layers[0].weights.base is None
+    changed = sum(child.layers[0].weights is not parent.layers[0].weights for parent, child in zip(parents, children))
+    print(f"Children with a changed first layer: {changed} of {len(children)}")
+    assert changed > 150
+
+    print("\n[World Test]")
+    np.random.seed(7)
+    env = EdenOfShadows(width=30, height=30, max_food=120, mutation_rates=0.0)
+    for _ in range(10):
+        env.add_entity(LiminalEntity(calories=200))
+    births = 0
+    for _ in range(40):
+        env.step()
+        births += env.tick_births
+    print(f"{births} births without mutation -> {env.unique_genomes()} unique genomes")
+    assert births > 0 and env.unique_genomes() <= 10
+
+def test_fused_kernel():
+    print("\nRunning the integer-only fused kernel against the float32 forward pass...")
+    np.random.seed(8)
+    checked = 0
+    for packed in (False, True):
+        for _ in range(100):
+            genome = BitNetGenome(layer_sizes=[10, 16, 5], packed=packed)
+            kernel = genome.fused()
+            assert genome.fused() is kernel
+            for _ in range(20):
+                vision = (np.random.rand(9) < np.random.rand()).astype(int).tolist()
+                # Ordinary, starving, overfed and vanishingly small calorie scalars
+                score = float(np.random.choice([np.random.randint(-5, 500) / 200.0, np.random.rand() * 1e-5]))
+                state = vision + [score]
+                assert quantize_state(state) == activation_quant_8bit(np.array(state, dtype=np.float32)).tolist()
+                expected = genome.forward(np.array(state))
+                assert np.array_equal(np.array(kernel.forward(state), dtype=np.float32), expected)
+                checked += 1
+    print(f"{checked} states, logits bit-identical")
+
+    # Interned twins share one kernel through the world's genome pool
+    env = EdenOfShadows(width=10, height=10)
+    parent = BitNetGenome(layer_sizes=[10, 16, 5])
+    twins = [LiminalEntity(genome=BitNetGenome.from_weights([10, 16, 5], [layer.weights.copy() for layer in parent.layers]))
+             for _ in range(2)]
+    for twin in twins:
+        env.add_entity(twin)
+    kernel = env.fused_kernel(twins[0].genome)
+    assert env.fused_kernel(twins[1].genome) is kernel and not hasattr(twins[1].genome, '_fused')
+    print("Pooled twins share one fused kernel")
+
+if __name__ == "__main__":
+    test_packed_genome()
+    test_genome_pool()
+    test_policy_table()
+    test_batched_mutation()
+    test_fused_kernel()
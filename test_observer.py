@@ -0,0 +1,79 @@
+import random
+import socket
+import time
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+from observer import ObservationServer, ObservationClient
+
+def test_observation_server():
+    print("Publishing live frames to local observers...")
+    random.seed(0)
+    np.random.seed(0)
+    env = EdenOfShadows(width=60, height=40, max_food=200, engine="vectorized")
+    for _ in range(150):
+        env.add_entity(LiminalEntity(calories=200))
+
+    server = ObservationServer(max_buffered=4096).start()
+    watcher = ObservationClient(port=server.port, timeout=10)
+    # An observer that connects and never reads a byte
+    stalled = socket.socket()
+    stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    stalled.connect(("127.0.0.1", server.port))
+    while server.clients < 2:
+        time.sleep(0.01)
+
+    # 1. A client that keeps up sees every tick exactly, as deltas after the first keyframe
+    print("\n[Live Frames Test]")
+    sizes = []
+    for tick in range(150):
+        env.step()
+        server.publish(env)
+        frame = watcher.recv()
+        xs, ys = env.positions()
+        assert frame['tick'] == env.tick and frame['keyframe'] == (tick == 0) and frame['dropped'] == 0
+        assert np.array_equal(frame['food'], env.food.cells)
+        assert np.array_equal(frame['xs'], xs) and np.array_equal(frame['ys'], ys)
+        assert np.allclose(frame['calories'], env.population.calories[:env.population.size])
+        assert frame['telemetry']['births'] == env.tick_births
+        assert frame['telemetry']['actions'] == env.tick_actions.tolist()
+        sizes.append(len(frame['xs']))
+    print(f"150 ticks mirrored exactly; population {sizes[0]} -> {sizes[-1]}")
+
+    # 2. The stalled client never holds the simulation back: once its socket is full it just misses frames
+    print("\n[Slow Observer Test]")
+    ticks = 0
+    while server.frames_dropped == 0 and ticks < 500:
+        env.step()
+        server.publish(env)
+        watcher.recv()
+        ticks += 1
+    print(f"Frames sent: {server.frames_sent} | skipped for the stalled observer: {server.frames_dropped} "
+          f"(after {150 + ticks} ticks)")
+    assert server.frames_dropped > 0 and server.clients == 2
+
+    # 3. Observers that fall behind resume with a delta that says how much they missed
+    for _ in range(20):
+        env.step()
+        server.publish(env)
+    time.sleep(0.2)
+    caught_up = None
+    while caught_up is None or caught_up['tick'] < env.tick:
+        caught_up = watcher.recv()
+    print(f"Watcher back at tick {caught_up['tick']}")
+
+    # 4. Disconnected observers are dropped without a fuss
+    stalled.close()
+    deadline = time.time() + 5
+    while server.clients > 1 and time.time() < deadline:
+        env.step()
+        server.publish(env)
+        watcher.recv()
+    print(f"Observers left after a disconnect: {server.clients}")
+    assert server.clients == 1
+
+    watcher.close()
+    server.close()
+
+if __name__ == "__main__":
+    test_observation_server()
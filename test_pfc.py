@@ -1,4 +1,6 @@
-from pfc import SyntheticPFC
+import random
+import numpy as np
+from pfc import SyntheticPFC, SyntheticPFCBank, RULES
 
 def test_pfc_fatigue():
     print("Initializing Synthetic PFC (CEO of the brain)...")
@@ -38,5 +40,119 @@ def test_pfc_fatigue():
     else:
         print("  -> PFC SUCCESS! Logic prevailed over impulse.")
 
+class EagerPFC(SyntheticPFC):
+    """The original per-item decay loop over a plain dict, kept as the reference."""
+    def __init__(self, max_energy=100.0):
+        super().__init__(max_energy)
+        self.working_memory = {}
+
+    def update_working_memory(self, key, data, current_tick):
+        if not self.is_depleted():
+            self.working_memory[key] = {'data': data, 'confidence': 1.0, 'timestamp': current_tick}
+            self.executive_energy -= 1.0
+
+    def process_memory_decay(self, stress_level):
+        decay_rate = 0.05 + (stress_level * 0.1) + (self.get_fatigue_level() * 0.1)
+        keys_to_remove = []
+        for key, mem in self.working_memory.items():
+            mem['confidence'] -= decay_rate
+            self.executive_energy -= self.cost_memory_retain
+            if mem['confidence'] <= 0:
+                keys_to_remove.append(key)
+        for key in keys_to_remove:
+            del self.working_memory[key]
+
+def test_lazy_working_memory():
+    print("\n[Lazy Decay Test]")
+    for seed, max_energy in ((0, 100.0), (1, 1e6), (2, 37.3)):
+        rng = random.Random(seed)
+        lazy, eager = SyntheticPFC(max_energy), EagerPFC(max_energy)
+        for tick in range(400):
+            for _ in range(rng.randint(0, 4)):
+                key, data = f"ITEM_{rng.randint(0, 30)}", rng.random()
+                lazy.update_working_memory(key, data, tick)
+                eager.update_working_memory(key, data, tick)
+            if rng.random() < 0.1:
+                lazy.rest(5.5)
+                eager.rest(5.5)
+            stress, goal = rng.choice([0.0, 0.3, 0.9, -0.9, rng.random()]), rng.random() < 0.05
+            random.seed(tick) # check_rule_switch draws from the global RNG
+            lazy.tick(tick, stress, goal)
+            random.seed(tick)
+            eager.tick(tick, stress, goal)
+            # Bit-identical energy, same keys in the same order, same confidences
+            assert lazy.executive_energy == eager.executive_energy
+            assert lazy.current_rule == eager.current_rule
+            assert list(lazy.working_memory) == list(eager.working_memory)
+            for key, mem in eager.working_memory.items():
+                assert lazy.working_memory[key] == mem
+        print(f"Seed {seed}: 400 ticks identical, final energy {lazy.executive_energy:.2f}, "
+              f"{len(lazy.working_memory)} items held")
+
+def _drive_bank(ids, ticks, seed):
+    """Feeds a bank (and one SyntheticPFC per entity) the same per-entity inputs."""
+    bank = SyntheticPFCBank(len(ids), max_energy=100.0, seed=7, ids=ids)
+    scalars = [SyntheticPFC(max_energy=100.0) for _ in ids]
+    history = []
+    for tick in range(ticks):
+        # Inputs depend only on (entity id, tick), so a subset bank sees the same ones
+        rngs = [random.Random(seed * 100003 + int(i) * 1009 + tick) for i in ids]
+        stress = np.array([rng.random() for rng in rngs])
+        goal = np.array([rng.random() < 0.01 for rng in rngs])
+        strength = np.array([rng.choice([0.0, 0.0, 0.5, 2.0]) for rng in rngs])
+        encode = [rng.random() < 0.3 for rng in rngs]
+        keys = [rng.randint(0, 9) for rng in rngs]
+        resting = np.array([rng.random() < 0.6 for rng in rngs])
+
+        rows = np.nonzero(encode)[0]
+        bank.update_working_memory(rows, np.array(keys)[rows], tick)
+        active = strength > 0
+        overridden = bank.top_down_modulate(strength, active=active)
+        bank.rest(6.0, rows=np.nonzero(resting)[0])
+        bank.tick(tick, stress, goal)
+
+        for j, pfc in enumerate(scalars):
+            if encode[j]:
+                pfc.update_working_memory(keys[j], None, tick)
+            if active[j]:
+                assert pfc.top_down_modulate("IMPULSE", strength[j], "LOGIC") == ("LOGIC" if overridden[j] else "IMPULSE")
+            if resting[j]:
+                pfc.rest(6.0)
+            pfc.tick(tick, stress[j], goal[j])
+        history.append((bank.rule_names(), bank.switches.copy()))
+    return bank, scalars, history
+
+def test_pfc_bank():
+    print("\n[PFC Bank Test]")
+    ids = np.arange(40) * 3 + 5
+    bank, scalars, history = _drive_bank(ids, 300, seed=1)
+    rules = [names for names, _ in history]
+    heuristics = ("FORAGE", "HIDE", "EXPLORE")
+    for j, pfc in enumerate(scalars):
+        assert bank.executive_energy[j] == pfc.executive_energy
+        assert bank.stagnation_counter[j] == pfc.stagnation_counter
+        held = {k: c for k, c in zip(bank.memory_keys[j].tolist(), bank.memory_confidence[j].tolist()) if k >= 0}
+        assert held == {key: mem['confidence'] for key, mem in pfc.working_memory.items()}
+        # Which heuristic was drawn comes from different RNGs; everything else matches
+        rule = RULES[bank.current_rule[j]]
+        assert rule == pfc.current_rule or (rule in heuristics and pfc.current_rule in heuristics)
+    switches = int(bank.switches.sum())
+    print(f"40 entities x 300 ticks match SyntheticPFC; {switches} rule switches, rules now {sorted(set(rules[-1]))}")
+    assert switches > 0
+    # A switch never lands on the heuristic the entity was already following
+    for (before, count_before), (after, count_after) in zip(history, history[1:]):
+        for j in np.nonzero(count_after != count_before)[0]:
+            assert after[j] in heuristics and after[j] != before[j]
+
+    # Counter-based RNG: an entity's rule history does not depend on who else is in the bank
+    subset = ids[::4][::-1]
+    _, _, sub_history = _drive_bank(subset, 300, seed=1)
+    position = {int(i): j for j, i in enumerate(ids)}
+    for (full_rules, _), (sub_rules, _) in zip(history, sub_history):
+        assert sub_rules == [full_rules[position[int(i)]] for i in subset]
+    print(f"Reversed subset of {len(subset)} entities reproduced its rule switches exactly")
+
 if __name__ == "__main__":
     test_pfc_fatigue()
+    test_lazy_working_memory()
+    test_pfc_bank()
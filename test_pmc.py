@@ -1,4 +1,6 @@
-from pmc import SyntheticM1
+import random
+import numpy as np
+from pmc import SyntheticM1, SyntheticM1Bank, part_codes
 
 def test_pmc_friction():
     print("Initializing Synthetic Primary Motor Cortex (sM1)...\n")
@@ -52,5 +54,131 @@ def test_pmc_friction():
         print(f"Tick 11: sM1 trips! Proprioceptive mismatch detected.")
         print(f"  -> Recovery Ticks Remaining: {sm1.trip_recovery_ticks}")
 
+class ListM1(SyntheticM1):
+    """The original list-of-dicts queue, rescanned every tick, kept as the reference."""
+    def receive_command(self, current_tick, body_part, target_vector, force_multiplier, limbic_stress):
+        super().receive_command(current_tick, body_part, target_vector, force_multiplier, limbic_stress)
+        execute_tick, _, dx, dy, force, part = self.spinal_cord_queue.pop()
+        self.pending = getattr(self, 'pending', [])
+        self.pending.append({'vector': (dx, dy), 'part': part, 'force': force, 'execute_tick': execute_tick})
+
+    def execute_tick(self, current_tick, actual_position):
+        self.pending = getattr(self, 'pending', [])
+        if self.tripped:
+            self.trip_recovery_ticks -= 1
+            if self.trip_recovery_ticks <= 0:
+                self.tripped = False
+            return (0, 0), 0.0
+        if self.last_expected_position is not None and self.last_expected_position != actual_position:
+            self.tripped = True
+            self.trip_recovery_ticks = 2
+            self.last_expected_position = actual_position
+            self.pending.clear()
+            return (0, 0), 0.0
+        execution_vector = (0, 0)
+        total_force_used = 0.0
+        keep = []
+        for cmd in self.pending:
+            if current_tick >= cmd['execute_tick']:
+                execution_vector = (execution_vector[0] + cmd['vector'][0], execution_vector[1] + cmd['vector'][1])
+                total_force_used += cmd['force']
+            else:
+                keep.append(cmd)
+        self.pending = keep
+        if execution_vector != (0, 0):
+            self.last_expected_position = (actual_position[0] + execution_vector[0], actual_position[1] + execution_vector[1])
+        else:
+            self.last_expected_position = actual_position
+        return execution_vector, total_force_used
+
+def test_heap_queue():
+    print("\n--- TEST 4: Heap Queue vs. Rescanned List ---")
+    heap_m1, list_m1 = SyntheticM1(), ListM1()
+    rng = random.Random(3)
+    pos_heap = pos_list = (0, 0)
+    trips = fired = 0
+    for tick in range(2000):
+        for _ in range(rng.randint(0, 3)):
+            args = (tick, rng.choice(["FACE", "HANDS", "LEGS", "TORSO"]),
+                    (rng.randint(-2, 2), rng.randint(-2, 2)), rng.random(), rng.random())
+            state = random.getstate()
+            heap_m1.receive_command(*args)
+            random.setstate(state) # Both see the same tremor draw
+            list_m1.receive_command(*args)
+        a = heap_m1.execute_tick(tick, pos_heap)
+        b = list_m1.execute_tick(tick, pos_list)
+        assert a == b and heap_m1.tripped == list_m1.tripped
+        trips += heap_m1.tripped and heap_m1.trip_recovery_ticks == 2
+        fired += a[0] != (0, 0)
+        # The world sometimes blocks the move, which trips proprioception
+        if rng.random() < 0.9:
+            pos_heap = pos_list = (pos_heap[0] + a[0][0], pos_heap[1] + a[0][1])
+    print(f"2000 ticks identical: {fired} movements, {trips} trips, {len(heap_m1.spinal_cord_queue)} commands pending")
+    assert fired > 0 and trips > 0
+
+def test_m1_bank():
+    print("\n--- TEST 5: Batched M1 Bank vs. One SyntheticM1 per Entity ---")
+    rng = random.Random(5)
+    bank = SyntheticM1Bank(20)
+    scalars = [SyntheticM1() for _ in range(20)]
+    positions = np.zeros((20, 2), dtype=np.int64)
+    precision = SyntheticM1().homunculus
+    moved = trips = 0
+    for tick in range(600):
+        if tick == 300:
+            # Population change: drop every third entity, then two newcomers are born
+            keep = np.arange(len(bank)) % 3 != 0
+            bank.compact(keep)
+            scalars = [m1 for m1, kept in zip(scalars, keep) if kept]
+            positions = positions[keep]
+            bank.add([100, 101])
+            scalars += [SyntheticM1(), SyntheticM1()]
+            positions = np.vstack([positions, np.zeros((2, 2), dtype=np.int64)])
+        n = len(bank)
+        k = rng.randint(0, 12)
+        rows = np.array([rng.randrange(n) for _ in range(k)], dtype=np.int64)
+        parts = [rng.choice(["FACE", "HANDS", "LEGS", "TORSO", "TAIL"]) for _ in range(k)]
+        vectors = np.array([(rng.randint(-2, 2), rng.randint(-2, 2)) for _ in range(k)]).reshape(-1, 2)
+        forces = np.array([rng.choice([0.0, 0.5, 1.0, 2 * rng.random()]) for _ in range(k)])
+        stress = np.array([rng.choice([0.0, rng.random()]) for _ in range(k)])
+
+        np.random.seed(tick)
+        bank.receive_batch(tick, rows, part_codes(parts), vectors, forces, stress)
+        # Replay the bank's tremor draws through random.uniform for the scalar M1s
+        shaky = sum(s > 0 and precision.get(p, 0.5) < 1 for s, p in zip(stress, parts))
+        np.random.seed(tick)
+        draws = list(np.random.random_sample(shaky))
+        uniform, random.uniform = random.uniform, lambda a, b: a + (b - a) * draws.pop(0)
+        try:
+            for j in range(k):
+                scalars[rows[j]].receive_command(tick, parts[j], tuple(vectors[j].tolist()), float(forces[j]), float(stress[j]))
+        finally:
+            random.uniform = uniform
+
+        out_vectors, out_forces = bank.execute_tick(tick, positions)
+        for i, m1 in enumerate(scalars):
+            vector, force = m1.execute_tick(tick, tuple(positions[i].tolist()))
+            assert vector == tuple(out_vectors[i].tolist()) and force == out_forces[i]
+            assert m1.tripped == bank.tripped[i]
+            trips += m1.tripped and m1.trip_recovery_ticks == 2
+        moved += int(np.count_nonzero(out_vectors.any(axis=1)))
+        # The world occasionally refuses to move an entity, tripping it next tick
+        blocked = np.array([rng.random() < 0.05 for _ in range(n)])
+        positions[~blocked] += out_vectors[~blocked]
+    print(f"600 ticks identical across a population change: {moved} movements, {trips} trips")
+    assert moved > 0 and trips > 0
+
+    # On a wrapping world, stepping off the edge lands where M1 expected
+    edge = SyntheticM1Bank(1)
+    position = np.array([[9, 0]], dtype=np.int64)
+    for tick in range(6):
+        edge.receive_batch(tick, np.array([0]), part_codes(["LEGS"]), np.array([[1, 0]]), np.ones(1), np.zeros(1))
+        vectors, _ = edge.execute_tick(tick, position, world_size=(10, 5))
+        position = (position + vectors) % [10, 5]
+        assert not edge.tripped[0]
+    print(f"Wrapped around a 10-wide world without tripping, now at {position[0].tolist()}")
+
 if __name__ == "__main__":
     test_pmc_friction()
+    test_heap_queue()
+    test_m1_bank()
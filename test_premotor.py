@@ -1,5 +1,22 @@
-from premotor import SyntheticPMC
-from pmc import SyntheticM1
+import random
+import numpy as np
+from premotor import SyntheticPMC, SyntheticPMCBank, MACROS, NO_MACRO
+from pmc import SyntheticM1, SyntheticM1Bank
+from environment import EdenOfShadows
+from entity import LiminalEntity
+
+def legacy_prepare_macro(pmc, macro_name, pfc_cognitive_load, limbic_stress, current_tick, m1_module):
+    """The original step-by-step expansion, kept as a reference for the compiled plans."""
+    if limbic_stress >= 0.9 and macro_name not in ["FREEZE", "FLEE_SPRINT"]:
+        macro_name = "FREEZE"
+    clumsiness_modifier = 0.5 if pfc_cognitive_load > 0.8 else 1.0
+    for tick_offset, body_part, target_vector, force in pmc.action_library.get(macro_name, []):
+        actual_tick_to_fire = current_tick + tick_offset
+        if limbic_stress > 0.7 and tick_offset > 0:
+            if random.random() < (limbic_stress * 0.5):
+                actual_tick_to_fire = current_tick
+        m1_module.receive_command(current_tick=actual_tick_to_fire, body_part=body_part, target_vector=target_vector,
+                                  force_multiplier=force * clumsiness_modifier, limbic_stress=limbic_stress)
 
 def test_spmc_tactics():
     print("Initializing Synthetic Premotor Cortex (sPMC) & Primary Motor Cortex (sM1)...\n")
@@ -28,7 +45,6 @@ def test_spmc_tactics():
     print("--- TEST 3: The Flinch (Jumping the Gun) ---")
     print("Goal: Execute 'FLEE_SPRINT' (a 3-tick sequence [0, 1, 2]) under High Stress (0.8).")
     # Setting seed for reproducible flinch testing
-    import random
     random.seed(42) 
     
     spmc.prepare_macro("FLEE_SPRINT", pfc_cognitive_load=0.0, limbic_stress=0.8, current_tick=20, m1_module=mock_m1)
@@ -45,5 +61,100 @@ def test_spmc_tactics():
     else:
         print("  -> Observer remained calm.")
 
+def test_compiled_plans():
+    print("\n--- TEST 5: Compiled Macro Plans vs. Step-by-Step Expansion ---")
+    compiled, legacy = SyntheticPMC(), SyntheticPMC()
+
+    class RecordingM1:
+        def __init__(self):
+            self.commands = []
+        def receive_command(self, current_tick, body_part, target_vector, force_multiplier, limbic_stress):
+            self.commands.append((current_tick, body_part, target_vector, force_multiplier, limbic_stress))
+
+    fast_m1, slow_m1 = RecordingM1(), RecordingM1()
+    macros = list(compiled.action_library) + ["UNKNOWN"]
+    rng = random.Random(3)
+    for tick in range(2000):
+        request = (rng.choice(macros), rng.random(), rng.choice([0.0, 0.5, 0.75, 0.95, rng.random()]), tick)
+        # Same seed for both: the flinch rolls must come out the same
+        random.seed(tick)
+        compiled.prepare_macro(*request, m1_module=fast_m1)
+        random.seed(tick)
+        legacy_prepare_macro(legacy, *request, m1_module=slow_m1)
+    assert fast_m1.commands == slow_m1.commands
+    flinched = sum(1 for a, b in zip(fast_m1.commands, fast_m1.commands[1:]) if b[0] < a[0])
+    print(f"2000 macros, {len(fast_m1.commands)} identical commands ({flinched}+ flinches); "
+          f"{len(compiled._plans)} plans compiled")
+    assert flinched > 0 and len(compiled._plans) <= len(macros) * 4
+
+    # A batched enqueue queues exactly what one receive_command per step would
+    commands = fast_m1.commands[:600]
+    batched, stepwise = SyntheticM1(), SyntheticM1()
+    random.seed(7)
+    for command in commands:
+        stepwise.receive_command(*command)
+    random.seed(7)
+    start = 0
+    while start < len(commands):
+        end = start + 1 # Consecutive commands with the same stress, as a macro would send them
+        while end < len(commands) and commands[end][4] == commands[start][4]:
+            end += 1
+        ticks, parts, vectors, forces, stress = zip(*commands[start:end])
+        batched.receive_commands(ticks, parts, vectors, forces, stress[0])
+        start = end
+    assert batched.spinal_cord_queue == stepwise.spinal_cord_queue
+
+    # Redefining a macro recompiles its plans
+    compiled.define_macro("FREEZE", [(0, "LEGS", (0, 0), 0.0)])
+    assert len(compiled.compile_plan("COMPLEX_EVADE", False, True)) == 1
+    # ...and so does editing action_library directly, in place or by replacing the entry
+    compiled.action_library["FREEZE"].append((1, "TORSO", (0, 0), 0.0))
+    assert compiled.compile_plan("COMPLEX_EVADE", False, True).offsets == [0, 1]
+    compiled.action_library["PRECISE_GRASP"] = [(0, "HANDS", (1, 1), 1.0)]
+    assert compiled.compile_plan("PRECISE_GRASP", True, False).forces == [0.5]
+    compiled.define_macro("WAVE", [(0, "HANDS", (0, 1), 1.0)])
+    assert len(compiled.compile_plan("WAVE", False, False)) == 1
+    del compiled.action_library["WAVE"]
+    assert compiled.compile_plan("WAVE", False, False) is None
+
+    # One batch into a bank row, bypassing the flinch with calm stress
+    bank = SyntheticM1Bank(3)
+    compiled.prepare_macro("FLEE_SPRINT", 0.0, 0.0, 0, m1_module=bank, row=1)
+    positions, moves = np.zeros((3, 2), dtype=np.int64), []
+    for t in range(5):
+        vectors, _ = bank.execute_tick(t, positions)
+        positions += vectors
+        moves.append(vectors[1].tolist())
+    print(f"Bank row 1 sprints: {moves}")
+    assert moves == [[0, 0], [0, 0], [0, -1], [0, -1], [0, -1]]
+
+def test_mirror_histogram():
+    print("\n--- TEST 6: Mirror Neurons from a Neighbourhood Histogram ---")
+    np.random.seed(6)
+    random.seed(6)
+    env = EdenOfShadows(width=30, height=20, engine="vectorized")
+    for _ in range(250):
+        env.add_entity(LiminalEntity(calories=200))
+    xs, ys = env.positions()
+    macros = np.random.randint(NO_MACRO, len(MACROS), size=len(xs))
+
+    counts = env.macro_histogram(macros, len(MACROS), radius=2)
+    bank = SyntheticPMCBank(len(xs))
+    decided = bank.process_mirror_neurons(counts, xs, ys, own_macros=macros)
+
+    # Reference: the scalar PMC fed each entity's peers from a radius query, lowest macro code first
+    pmc = SyntheticPMC()
+    for slot, entity in enumerate(env.entities):
+        peers = sorted(macros[other._index] for other in env.entities_near(entity.x, entity.y, 2)
+                       if other.id != entity.id and macros[other._index] != NO_MACRO)
+        expected = pmc.process_mirror_neurons([MACROS[code] for code in peers])
+        assert decided[slot] == (NO_MACRO if expected is None else MACROS.index(expected))
+    mirrored = np.bincount(decided + 1, minlength=len(MACROS) + 1)
+    print(f"250 entities, one histogram: {mirrored[0]} calm, mirrored " +
+          ", ".join(f"{name}={count}" for name, count in zip(MACROS, mirrored[1:])))
+    assert 0 < mirrored[0] < len(xs)
+
 if __name__ == "__main__":
     test_spmc_tactics()
+    test_compiled_plans()
+    test_mirror_histogram()
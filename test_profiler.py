@@ -0,0 +1,37 @@
+import random
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+
+def test_tick_profiler():
+    for engine in ("object", "vectorized"):
+        print(f"\n[{engine} engine]")
+        random.seed(1)
+        np.random.seed(1)
+        env = EdenOfShadows(width=30, height=30, max_food=60, engine=engine)
+        for _ in range(30):
+            env.add_entity(LiminalEntity(calories=200))
+
+        # Profiling is off by default and can be toggled between ticks
+        env.step()
+        assert env.profiler is None
+
+        profiler = env.enable_profiling()
+        births = deaths = 0
+        for _ in range(20):
+            env.step()
+            births += env.tick_births
+            deaths += env.tick_deaths
+        env.disable_profiling()
+        env.step()
+
+        report = profiler.report()
+        print(profiler.format())
+        assert report['ticks'] == 20
+        assert report['counters']['births'] == births
+        assert report['counters']['deaths'] == deaths
+        assert report['phases']['spawn_food']['calls'] == 20
+        assert report['phases']['reproduction']['calls'] == 20
+
+if __name__ == "__main__":
+    test_tick_profiler()
@@ -0,0 +1,104 @@
+import os
+import random
+import tempfile
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+from replay import ReplayRecorder, ReplayLog
+from brain import BrainPipeline
+
+def _state(env):
+    pop = env.population
+    n = pop.size
+    return ([pop.ids[:n].copy(), pop.x[:n].copy(), pop.y[:n].copy(), pop.calories[:n].copy(),
+             env.food.cells.copy()] + [w[:n].copy() for w in pop.weights], env.food.count)
+
+def _same(a, b):
+    return a[1] == b[1] and len(a[0]) == len(b[0]) and all(np.array_equal(x, y) for x, y in zip(a[0], b[0]))
+
+def _world():
+    random.seed(4)
+    np.random.seed(4)
+    env = EdenOfShadows(width=40, height=40, max_food=200, engine="vectorized", mutation_rates=0.05)
+    for _ in range(60):
+        env.add_entity(LiminalEntity(calories=200))
+    for _ in range(5):
+        env.step() # Recording can start mid-run
+    return env
+
+def test_replay_seek():
+    path = os.path.join(tempfile.mkdtemp(), "world.rpl")
+    env = _world()
+
+    # Small blocks so the log spans many of them
+    recorder = ReplayRecorder(env, path, keyframe_every=50, chunk_bytes=4096)
+    states = {env.tick: _state(env)}
+    births = deaths = 0
+    for _ in range(180):
+        env.step()
+        births += env.tick_births
+        deaths += env.tick_deaths
+        states[env.tick] = _state(env)
+    recorder.close()
+    assert env.recorder is None and births > 0 and deaths > 0
+
+    # Recording draws nothing: an unrecorded run ends in the same world
+    unrecorded = _world()
+    for _ in range(180):
+        unrecorded.step()
+    assert _same(_state(unrecorded), states[env.tick])
+
+    log = ReplayLog(path)
+    print(f"Recorded ticks {log.first_tick}..{log.last_tick}: {births} births, {deaths} deaths in "
+          f"{os.path.getsize(path)} bytes, {len(log.chunks)} blocks, keyframes at {[t for t, _ in log.keyframes]}")
+    assert [t for t, _ in log.keyframes] == [5, 50, 100, 150] and len(log.chunks) > 4
+
+    # Any tick, from its nearest keyframe, without touching either RNG
+    rng_before = np.random.get_state()[1].copy(), random.getstate()
+    for tick in (5, 6, 49, 50, 51, 120, 150, 185):
+        replayed = log.seek(tick)
+        assert replayed.tick == tick and _same(_state(replayed), states[tick]), tick
+    assert np.array_equal(np.random.get_state()[1], rng_before[0]) and random.getstate() == rng_before[1]
+
+    # Scrubbing forward from a seek matches too, tick counters included
+    replayed = log.seek(60)
+    for tick in range(61, 80):
+        log.play(replayed, tick)
+        assert _same(_state(replayed), states[tick])
+    print("Seeks and scrubbing match the live run at every tick checked")
+
+    try:
+        log.seek(186)
+        assert False, "seek past the end of the log"
+    except ValueError:
+        pass
+
+    # Recording a rebuilt world under the same name rewrites the keyframe it was built from
+    world = log.seek(50)
+    with ReplayRecorder(world, path, keyframe_every=50):
+        assert _same(_state(world), states[50])
+    assert _same(_state(world), states[50]) and _same(_state(ReplayLog(path).seek(50)), states[50])
+
+def test_replay_rejects_brain_pipeline():
+    path = os.path.join(tempfile.mkdtemp(), "brain.rpl")
+    # Attached before or after the pipeline exists, the recorder must not end up with an empty log
+    env = _world()
+    brain = BrainPipeline(env)
+    with ReplayRecorder(env, path):
+        try:
+            brain.step()
+            assert False, "brain tick with a recorder attached"
+        except ValueError as error:
+            print(f"Brain tick refused: {error}")
+    brain.step() # Fine again once the recorder is closed
+
+    with ReplayRecorder(env, path):
+        try:
+            BrainPipeline(env)
+            assert False, "brain pipeline built with a recorder attached"
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_replay_seek()
+    test_replay_rejects_brain_pipeline()
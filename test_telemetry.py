@@ -0,0 +1,46 @@
+import os
+import random
+import tempfile
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+from telemetry import TelemetrySink, TelemetryReader, read_telemetry
+
+def test_streaming_telemetry():
+    path = os.path.join(tempfile.mkdtemp(), "run.tlm")
+    random.seed(4)
+    np.random.seed(4)
+    env = EdenOfShadows(width=30, height=30, max_food=60, engine="vectorized")
+    for _ in range(30):
+        env.add_entity(LiminalEntity(calories=200))
+
+    print("Recording 100 ticks in 16-tick chunks while a reader tails the file...")
+    sink = TelemetrySink(path, chunk_ticks=16)
+    reader = TelemetryReader(path)
+    seen = 0
+    populations = []
+    for tick in range(100):
+        env.step()
+        sink.record(env)
+        populations.append(len(env.entities))
+        if tick % 20 == 19:
+            fresh = reader.poll()
+            seen += len(fresh['tick'])
+            print(f"Tick {tick}: reader has {seen} rows (only whole chunks are visible)")
+            assert seen == (tick + 1) // 16 * 16
+    sink.close()
+    seen += len(reader.poll()['tick'])
+    assert seen == 100
+
+    columns = read_telemetry(path)
+    assert list(columns['tick']) == list(range(1, 101))
+    assert list(columns['population']) == populations
+    actions = sum(columns[f"action_{a}"] for a in ("N", "E", "S", "W", "Stay"))
+    print(f"Final tick: population {columns['population'][-1]}, median calories {columns['calories_p50'][-1]:.0f}")
+    # Every entity alive at the start of a tick chose exactly one action
+    before = np.concatenate([[30], columns['population'][:-1]])
+    assert np.array_equal(actions, before)
+    assert np.array_equal(columns['population'], before - columns['deaths'] + columns['births'])
+
+if __name__ == "__main__":
+    test_streaming_telemetry()
@@ -0,0 +1,39 @@
+import os
+import random
+import tempfile
+import numpy as np
+from environment import EdenOfShadows
+from entity import LiminalEntity
+from visualize import render_frame, run_headless, FOOD_COLOR, BACKGROUND
+
+def test_array_renderer():
+    print("Rendering a frame as one NumPy RGB array...")
+    random.seed(0)
+    np.random.seed(0)
+    env = EdenOfShadows(width=20, height=10, max_food=15, engine="vectorized")
+    env.add_entity(LiminalEntity(calories=100), x=3, y=4)
+    env.add_entity(LiminalEntity(calories=350), x=7, y=2)
+    env.spawn_food()
+    env.food.discard((3, 4))
+    env.food.discard((7, 2))
+
+    frame = render_frame(env, cell_size=3)
+    print(f"Frame shape: {frame.shape}")
+    assert frame.shape == (30, 60, 3)
+    # Half-starved entity: equal parts red and green; well-fed one is cyan
+    assert tuple(frame[4 * 3, 3 * 3]) == (127, 127, 0)
+    assert tuple(frame[2 * 3 + 2, 7 * 3 + 2]) == (0, 255, 255)
+    fx, fy = next(iter(env.food))
+    assert tuple(frame[fy * 3, fx * 3]) == FOOD_COLOR
+    empty = np.argwhere(~env.food.cells)
+    assert tuple(frame[empty[-1][0] * 3, empty[-1][1] * 3]) == BACKGROUND
+
+    print("\n[Headless Image Sequence]")
+    frames_dir = tempfile.mkdtemp()
+    run_headless(env, ticks=6, frames_dir=frames_dir, every=2)
+    written = sorted(os.listdir(frames_dir))
+    print(f"Wrote: {written}")
+    assert written == ["frame_0000000.ppm", "frame_0000002.ppm", "frame_0000004.ppm"]
+
+if __name__ == "__main__":
+    test_array_renderer()
@@ -1,20 +1,99 @@
-import pygame
+import argparse
+import os
 import sys
+import time
+import numpy as np
 from environment import EdenOfShadows
 from entity import LiminalEntity
 
-def main():
-    width, height = 50, 50
-    cell_size = 10
-    
+BACKGROUND = (20, 20, 20) # Dark background
+FOOD_COLOR = (0, 255, 0) # Green
+READY_COLOR = (0, 255, 255) # Cyan if ready to reproduce
+
+def _entity_columns(env):
+    if env.population is not None:
+        pop = env.population
+        n = pop.size
+        return pop.x[:n], pop.y[:n], pop.calories[:n]
+    entities = list(env.entities)
+    return (
+        np.fromiter((e.x for e in entities), dtype=np.int64, count=len(entities)),
+        np.fromiter((e.y for e in entities), dtype=np.int64, count=len(entities)),
+        np.fromiter((e.calories for e in entities), dtype=np.float64, count=len(entities)),
+    )
+
+def render_frame(env, cell_size=1):
+    """
+    The whole world as one (height * cell_size, width * cell_size, 3) uint8 image.
+    Same palette as the old per-rect drawing: food green, entities fading from
+    green to red as they starve, cyan once they are ready to reproduce.
+    """
+    xs, ys, calories = _entity_columns(env)
+    return render_arrays(env.food.cells, xs, ys, calories, cell_size)
+
+def render_arrays(food_cells, xs, ys, calories, cell_size=1):
+    """render_frame from bare arrays, e.g. a frame received from an ObservationServer."""
+    height, width = food_cells.shape
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = BACKGROUND
+    frame[food_cells] = FOOD_COLOR
+
+    if len(xs):
+        health_ratio = np.minimum(1.0, calories / 200.0)
+        colors = np.zeros((len(xs), 3), dtype=np.uint8)
+        colors[:, 0] = (255 * (1 - health_ratio)).astype(np.uint8)
+        colors[:, 1] = (255 * health_ratio).astype(np.uint8)
+        colors[calories > 300] = READY_COLOR
+        frame[ys, xs] = colors
+
+    if cell_size > 1:
+        frame = frame.repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+    return frame
+
+def write_ppm(path, frame):
+    """Binary PPM: no imaging library needed, which keeps headless runs dependency-free."""
+    height, width, _ = frame.shape
+    with open(path, 'wb') as f:
+        f.write(f"P6 {width} {height} 255\n".encode())
+        f.write(np.ascontiguousarray(frame).tobytes())
+
+def run_headless(env, ticks, frames_dir, every=1, cell_size=1, image_format="ppm"):
+    """Steps the world at full speed and saves every `every`-th frame as an image sequence."""
+    os.makedirs(frames_dir, exist_ok=True)
+    if image_format == "png":
+        import pygame
+        import pygame.surfarray
+
+    for t in range(ticks):
+        env.step()
+        if t % every == 0:
+            frame = render_frame(env, cell_size)
+            path = os.path.join(frames_dir, f"frame_{t:07d}.{image_format}")
+            if image_format == "png":
+                pygame.image.save(pygame.surfarray.make_surface(frame.swapaxes(0, 1)), path)
+            else:
+                write_ppm(path, frame)
+        if len(env.entities) == 0:
+            print(f"Extinction at tick {t}.")
+            break
+
+def run_window(env, cell_size=10, fps=30, tick_rate=0):
+    """
+    Interactive window. The simulation is no longer tied to the render clock:
+    between frames it steps as fast as it can (tick_rate=0) or at `tick_rate`
+    ticks per second, and each frame is one surfarray blit of render_frame().
+    """
+    import pygame
+    import pygame.surfarray
+
     pygame.init()
-    screen = pygame.display.set_mode((width * cell_size, height * cell_size))
+    screen = pygame.display.set_mode((env.width * cell_size, env.height * cell_size))
     pygame.display.set_caption("Eden of Shadows - Brainstem MVP")
-    clock = pygame.time.Clock()
 
-    env = EdenOfShadows(width=width, height=height, max_food=150)
-    for _ in range(50):
-        env.add_entity(LiminalEntity(calories=200))
+    frame_interval = 1.0 / fps
+    start = time.perf_counter()
+    next_frame = start
+    ticks = 0
 
     running = True
     while running:
@@ -22,31 +101,95 @@ def main():
             if event.type == pygame.QUIT:
                 running = False
 
-        env.step()
+        # Simulate until the next frame is due (or until the tick budget is spent)
+        now = time.perf_counter()
+        while now < next_frame:
+            if tick_rate and ticks >= (now - start) * tick_rate:
+                time.sleep(min(next_frame - now, 1.0 / tick_rate))
+            else:
+                env.step()
+                ticks += 1
+            now = time.perf_counter()
+
+        pygame.surfarray.blit_array(screen, render_frame(env, cell_size).swapaxes(0, 1))
+        pygame.display.set_caption(f"Eden of Shadows - tick {env.tick} - {len(env.entities)} entities")
+        pygame.display.flip()
+        next_frame = max(next_frame + frame_interval, now)
+
+        if len(env.entities) == 0:
+            print("Extinction.")
+            running = False
 
-        screen.fill((20, 20, 20)) # Dark background
+    pygame.quit()
 
-        # Draw food (Green)
-        for fx, fy in env.food:
-            pygame.draw.rect(screen, (0, 255, 0), (fx * cell_size, fy * cell_size, cell_size, cell_size))
+def run_remote(host, port, cell_size=10, fps=30):
+    """
+    Window onto a simulation running elsewhere (main.py --serve). Frames come
+    from an ObservationServer, so this viewer never slows the simulation down:
+    if it falls behind, the server just skips frames for it.
+    """
+    import pygame
+    import pygame.surfarray
+    from observer import ObservationClient
 
-        # Draw entities (White, fading to Red as they starve)
-        for entity in env.entities:
-            health_ratio = min(1.0, entity.calories / 200.0)
-            color = (int(255 * (1 - health_ratio)), int(255 * health_ratio), 0)
-            if entity.calories > 300:
-                color = (0, 255, 255) # Cyan if ready to reproduce
-            pygame.draw.rect(screen, color, (entity.x * cell_size, entity.y * cell_size, cell_size, cell_size))
+    client = ObservationClient(host, port)
+    frame = client.recv()
+    pygame.init()
+    screen = pygame.display.set_mode((frame['width'] * cell_size, frame['height'] * cell_size))
+    clock = pygame.time.Clock()
 
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        image = render_arrays(frame['food'], frame['xs'], frame['ys'], frame['calories'], cell_size)
+        pygame.surfarray.blit_array(screen, image.swapaxes(0, 1))
+        pygame.display.set_caption(f"Eden of Shadows - tick {frame['tick']} - "
+                                   f"{frame['telemetry']['population']} entities (remote)")
         pygame.display.flip()
-        
-        if len(env.entities) == 0:
-            print("Extinction.")
+        clock.tick(fps)
+        try:
+            frame = client.recv()
+        except ConnectionError:
+            print("Simulation ended.")
             running = False
-            
-        clock.tick(30) # 30 FPS
 
+    client.close()
     pygame.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch Eden of Shadows")
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--height", type=int, default=50)
+    parser.add_argument("--food", type=int, default=150)
+    parser.add_argument("--population", type=int, default=50)
+    parser.add_argument("--engine", choices=["object", "vectorized"], default="object")
+    parser.add_argument("--cell-size", type=int, default=None, help="Pixels per grid cell (10 windowed, 1 headless)")
+    parser.add_argument("--tick-rate", type=float, default=0, help="Target ticks/sec in the window (0 = as fast as possible)")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--headless", action="store_true", help="No window: write frames to --frames-dir instead")
+    parser.add_argument("--frames-dir", default="frames")
+    parser.add_argument("--ticks", type=int, default=1000, help="Headless run length")
+    parser.add_argument("--every", type=int, default=1, help="Headless: save every Nth tick")
+    parser.add_argument("--format", choices=["ppm", "png"], default="ppm", help="Headless image format (png needs pygame)")
+    parser.add_argument("--connect", default=None, help="Watch a run served by main.py --serve at HOST:PORT instead")
+    args = parser.parse_args()
+
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        run_remote(host, int(port), cell_size=args.cell_size or 10, fps=args.fps)
+        sys.exit()
+
+    env = EdenOfShadows(width=args.width, height=args.height, max_food=args.food, engine=args.engine)
+    for _ in range(args.population):
+        env.add_entity(LiminalEntity(calories=200))
+
+    if args.headless:
+        run_headless(env, args.ticks, args.frames_dir, every=args.every,
+                     cell_size=args.cell_size or 1, image_format=args.format)
+    else:
+        run_window(env, cell_size=args.cell_size or 10, fps=args.fps, tick_rate=args.tick_rate)
     sys.exit()
 
 if __name__ == "__main__":